@@ -1,25 +1,41 @@
 """Support to monitor and control Templari Kita heat pump via Modbus TCP + VNC."""
 
+import asyncio
+import time
+
+_import_started = time.perf_counter()
+
 from homeassistant.core import HomeAssistant
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_HOST, CONF_PORT, EVENT_HOMEASSISTANT_STOP, Platform
 from homeassistant.exceptions import ConfigEntryError
-from . import modbus
+from . import modbus, services, websocket
+from .exporter import KitaMetricsView
 from .coordinator import KitaCoordinator
-from .sensor import REG_RANGES
+from .curve import CurveController, HeatingCurve
+from .setpoints import SetpointWriter
+from .statistics import StatisticsAggregator
+from .registers import FAST_REG_RANGES, REG_RANGES
 
 import logging
-from .const import DOMAIN
+from . import const
+from .const import DOMAIN, CONF_STATISTICS_MODE
 
 PLATFORMS: list[Platform] = [
+    Platform.BINARY_SENSOR,
     Platform.SENSOR,
     Platform.NUMBER,
+    Platform.CAMERA,
 ]
 
 _LOGGER = logging.getLogger(__name__)
 
+# Time spent importing this package (the platforms load later, on setup)
+IMPORT_DURATION = time.perf_counter() - _import_started
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    started = time.perf_counter()
     hass.data.setdefault(DOMAIN, {})
     try:
         client = await modbus.connect(entry.data[CONF_HOST], entry.data[CONF_PORT])
@@ -27,16 +43,57 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         _LOGGER.error(f"Failed to connect to {entry.data[CONF_HOST]}:{entry.data[CONF_PORT]}")
         raise ConfigEntryError from e
 
-    coordinator = KitaCoordinator(hass, client, REG_RANGES)
+    coordinator = KitaCoordinator(hass, client, REG_RANGES, FAST_REG_RANGES)
+    await coordinator.async_load_state()
+    if entry.options.get(CONF_STATISTICS_MODE, False):
+        coordinator.statistics = StatisticsAggregator(hass)
+        # The hour in progress when the entry was last unloaded (e.g. on an options change)
+        coordinator.statistics.restore(hass.data.pop(f"{DOMAIN}_statistics_carry", None))
+
+    writer = SetpointWriter(hass, coordinator, entry.data.get(const.CONF_HMI_HOST, const.DEFAULT_HMI_HOST))
+    if entry.options.get(const.CONF_CURVE_ENABLED, False):
+        options = entry.options
+        coordinator.curve = CurveController(
+            hass,
+            coordinator,
+            writer,
+            HeatingCurve(
+                options.get(const.CONF_CURVE_BASE, const.DEFAULT_CURVE_BASE),
+                options.get(const.CONF_CURVE_SLOPE, const.DEFAULT_CURVE_SLOPE),
+                options.get(const.CONF_CURVE_MIN, const.DEFAULT_CURVE_MIN),
+                options.get(const.CONF_CURVE_MAX, const.DEFAULT_CURVE_MAX),
+            ),
+            options.get(const.CONF_CURVE_HYSTERESIS, const.DEFAULT_CURVE_HYSTERESIS),
+            options.get(const.CONF_CURVE_MIN_STEP, const.DEFAULT_CURVE_MIN_STEP),
+        )
+        entry.async_on_unload(coordinator.async_add_listener(coordinator.curve.async_on_update))
 
     hass.data[DOMAIN][entry.entry_id] = {
         "client": client,
         "coordinator": coordinator,
+        "setpoint_writer": writer,
     }
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    await services.async_setup_services(hass)
+    if not hass.data.get(f"{DOMAIN}_view_registered"):
+        # Views and websocket commands can't be unregistered; they answer
+        # with an error while the entry is unloaded
+        hass.http.register_view(KitaMetricsView(hass))
+        websocket.async_register_websocket_commands(hass)
+        hass.data[f"{DOMAIN}_view_registered"] = True
+    entry.async_on_unload(coordinator.async_start_polling())
+    _LOGGER.debug(
+        f"Set up in {time.perf_counter() - started:.3f}s (package import took {IMPORT_DURATION:.3f}s)"
+    )
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
 
     async def close_connection(event):
+        if (recorder := coordinator.trace_recorder) is not None:
+            await recorder.async_close()
+        if coordinator.statistics is not None:
+            coordinator.statistics.async_flush()
+        await coordinator.async_save_state()
         client.close()
 
     entry.async_on_unload(
@@ -46,10 +103,26 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return True
 
 
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
         data = hass.data[DOMAIN][entry.entry_id]
+        if (replay_task := data["coordinator"].replay_task) is not None:
+            replay_task.cancel()
+            await asyncio.wait([replay_task])
+        # The reloaded coordinator loads its totals from this write
+        await data["coordinator"].async_save_state()
+        websocket.async_end_subscriptions(data["coordinator"])
         data["client"].close()
+        if (recorder := data["coordinator"].trace_recorder) is not None:
+            await recorder.async_close()
+        if (statistics := data["coordinator"].statistics) is not None:
+            hass.data[f"{DOMAIN}_statistics_carry"] = statistics.async_flush()
         hass.data[DOMAIN].pop(entry.entry_id)
+        if not hass.data[DOMAIN]:
+            services.async_unload_services(hass)
 
     return unload_ok
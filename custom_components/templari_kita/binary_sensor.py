@@ -0,0 +1,88 @@
+"""Binary sensors derived from the compressor cycle detector."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable
+
+from homeassistant.components.binary_sensor import (
+    BinarySensorDeviceClass,
+    BinarySensorEntity,
+    BinarySensorEntityDescription,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity import EntityCategory
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from . import const
+from .coordinator import KitaCoordinator
+from .registers import create_device_info, entity_id
+
+
+@dataclass
+class KitaBinarySensorEntityDescription(BinarySensorEntityDescription):
+    value_fn: Callable[[KitaCoordinator], bool | None] | None = None
+
+
+BINARY_SENSOR_TYPES = [
+    KitaBinarySensorEntityDescription(
+        key="compressor-running",
+        device_class=BinarySensorDeviceClass.RUNNING,
+        name="Compressor running",
+        value_fn=lambda c: c.cycles.running,
+    ),
+    KitaBinarySensorEntityDescription(
+        key="defrost",
+        device_class=BinarySensorDeviceClass.RUNNING,
+        name="Defrost",
+        icon="mdi:snowflake-melt",
+        value_fn=lambda c: c.cycles.defrosting,
+    ),
+    KitaBinarySensorEntityDescription(
+        key="short-cycling",
+        device_class=BinarySensorDeviceClass.PROBLEM,
+        name="Compressor short cycling",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda c: c.cycles.short_cycling,
+    ),
+]
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    coordinator = hass.data[const.DOMAIN][config_entry.entry_id]["coordinator"]
+    async_add_entities(
+        [
+            KitaBinarySensor(hass=hass, coordinator=coordinator, description=description)
+            for description in BINARY_SENSOR_TYPES
+        ],
+        True,
+    )
+
+
+class KitaBinarySensor(CoordinatorEntity, BinarySensorEntity):
+    entity_description: KitaBinarySensorEntityDescription
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinator: KitaCoordinator,
+        description: KitaBinarySensorEntityDescription,
+    ) -> None:
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._attr_unique_id = f"{description.key}"
+        self.entity_id = entity_id("binary_sensor", description.name)
+        self._attr_device_info = create_device_info()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        value = self.entity_description.value_fn(self.coordinator)
+        self._attr_available = value is not None
+        self._attr_is_on = value
+        self.async_write_ha_state()
@@ -0,0 +1,123 @@
+"""Camera mirroring the Weintek HMI screen over VNC."""
+
+from __future__ import annotations
+
+import logging
+import struct
+import time
+from datetime import timedelta
+
+from homeassistant.components.camera import Camera
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_track_time_interval
+
+from . import const
+from .registers import create_device_info, entity_id
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    hmi_host = config_entry.data.get(const.CONF_HMI_HOST, const.DEFAULT_HMI_HOST)
+    async_add_entities([KitaHMICamera(hass, hmi_host)])
+
+
+class KitaHMICamera(Camera):
+    """The HMI screen, updated from incremental framebuffer updates.
+
+    The VNC module and session are only loaded once someone views the
+    camera. A JPEG is encoded only when a view finds the framebuffer changed;
+    with no viewer the session is kept alive at a slow rate and eventually
+    closed.
+    """
+
+    def __init__(self, hass: HomeAssistant, hmi_host: str) -> None:
+        super().__init__()
+        self._hmi_host = hmi_host
+        self._mirror = None
+        self._image: bytes | None = None
+        self._last_view = 0.0
+
+        self._attr_unique_id = "hmi-screen"
+        self.entity_id = entity_id("camera", "HMI screen")
+        self._attr_device_info = create_device_info()
+        self._attr_has_entity_name = False
+        self._attr_name = "HMI screen"
+        self._attr_icon = "mdi:monitor"
+        self._attr_frame_interval = const.HMI_MIRROR_FRAME_INTERVAL
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        if self._mirror is None:
+            return {"connected": False}
+        return {
+            "connected": self._mirror.connected,
+            "frame_updates": self._mirror.updates,
+            "dirty_rects": self._mirror.rects,
+        }
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_track_time_interval(
+                self.hass, self._async_keepalive, timedelta(seconds=const.HMI_MIRROR_KEEPALIVE)
+            )
+        )
+
+    async def async_will_remove_from_hass(self) -> None:
+        if self._mirror is not None:
+            from . import vnc
+
+            async with vnc.LOCK:
+                await self.hass.async_add_executor_job(self._mirror._close_sync)
+        await super().async_will_remove_from_hass()
+
+    async def async_camera_image(self, width: int | None = None, height: int | None = None) -> bytes | None:
+        from . import vnc
+
+        self._last_view = time.monotonic()
+        if self._mirror is None:
+            self._mirror = vnc.VNCMirror(self._hmi_host, const.VNC_PORT, const.VNC_PASSWORD)
+        async with vnc.LOCK:
+            try:
+                await self.hass.async_add_executor_job(
+                    self._mirror._refresh_sync, const.HMI_MIRROR_UPDATE_TIMEOUT
+                )
+            except (OSError, ConnectionError, struct.error) as e:
+                _LOGGER.debug(f"HMI mirror update failed: {e}")
+                return self._image
+            if self._image is None or self._mirror.dirty:
+                self._image = await self.hass.async_add_executor_job(self._mirror.encode_jpeg)
+        return self._image
+
+    async def _async_keepalive(self, now) -> None:
+        if self._mirror is None or not self._mirror.connected:
+            return
+        from . import vnc
+
+        if vnc.LOCK.locked():
+            return
+        idle = time.monotonic() - self._last_view
+        # A watched session is kept alive by the views themselves
+        if idle < const.HMI_MIRROR_IDLE_AFTER:
+            return
+        async with vnc.LOCK:
+            if not self._mirror.connected:
+                return
+            if idle >= const.HMI_MIRROR_CLOSE_AFTER:
+                _LOGGER.debug("Closing idle HMI mirror session")
+                await self.hass.async_add_executor_job(self._mirror._close_sync)
+                return
+            try:
+                # Patch the framebuffer so a returning viewer gets a small delta
+                await self.hass.async_add_executor_job(
+                    self._mirror._refresh_sync, const.HMI_MIRROR_UPDATE_TIMEOUT
+                )
+            except (OSError, ConnectionError, struct.error) as e:
+                _LOGGER.debug(f"HMI mirror keep-alive failed: {e}")
@@ -1,8 +1,10 @@
 from pymodbus.client import AsyncModbusTcpClient
 from homeassistant import config_entries
 from homeassistant.const import CONF_HOST, CONF_PORT
+from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
-from .const import DOMAIN, CONF_HMI_HOST, DEFAULT_HMI_HOST
+from .const import DOMAIN, CONF_HMI_HOST, DEFAULT_HMI_HOST, CONF_STATISTICS_MODE, CONF_EXPLORER_MODE
+from . import const
 import voluptuous as vol
 from . import modbus
 from typing import Any
@@ -18,6 +20,11 @@ class KitaConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     def __init__(self):
         self.client: AsyncModbusTcpClient | None = None
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: config_entries.ConfigEntry) -> config_entries.OptionsFlow:
+        return KitaOptionsFlow()
+
     async def configure_host(self, step_id: str, user_input: dict[str, Any]) -> FlowResult:
         errors = {}
         if user_input is not None:
@@ -54,3 +61,33 @@ class KitaConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     async def async_step_reconfigure(self, user_input: dict[str, Any] | None = None):
         return await self.configure_host("reconfigure", user_input)
+
+
+class KitaOptionsFlow(config_entries.OptionsFlow):
+
+    async def async_step_init(self, user_input: dict[str, Any] | None = None) -> FlowResult:
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self.config_entry.options
+        return self.async_show_form(step_id="init", data_schema=vol.Schema({
+            vol.Optional(CONF_STATISTICS_MODE, default=options.get(CONF_STATISTICS_MODE, False)): bool,
+            vol.Optional(CONF_EXPLORER_MODE, default=options.get(CONF_EXPLORER_MODE, False)): bool,
+            vol.Optional(const.CONF_CURVE_ENABLED, default=options.get(const.CONF_CURVE_ENABLED, False)): bool,
+            vol.Optional(const.CONF_CURVE_BASE, default=options.get(const.CONF_CURVE_BASE, const.DEFAULT_CURVE_BASE)):
+                vol.All(vol.Coerce(float), vol.Range(min=15, max=55)),
+            vol.Optional(const.CONF_CURVE_SLOPE, default=options.get(const.CONF_CURVE_SLOPE, const.DEFAULT_CURVE_SLOPE)):
+                vol.All(vol.Coerce(float), vol.Range(min=0, max=3)),
+            vol.Optional(const.CONF_CURVE_MIN, default=options.get(const.CONF_CURVE_MIN, const.DEFAULT_CURVE_MIN)):
+                vol.All(vol.Coerce(float), vol.Range(min=20, max=55)),
+            vol.Optional(const.CONF_CURVE_MAX, default=options.get(const.CONF_CURVE_MAX, const.DEFAULT_CURVE_MAX)):
+                vol.All(vol.Coerce(float), vol.Range(min=20, max=55)),
+            vol.Optional(
+                const.CONF_CURVE_HYSTERESIS,
+                default=options.get(const.CONF_CURVE_HYSTERESIS, const.DEFAULT_CURVE_HYSTERESIS),
+            ): vol.All(vol.Coerce(float), vol.Range(min=0, max=5)),
+            vol.Optional(
+                const.CONF_CURVE_MIN_STEP,
+                default=options.get(const.CONF_CURVE_MIN_STEP, const.DEFAULT_CURVE_MIN_STEP),
+            ): vol.All(vol.Coerce(float), vol.Range(min=const.SETPOINT_STEP, max=5)),
+        }))
@@ -9,8 +9,111 @@ DEFAULT_HMI_HOST = "10.0.42.132"
 VNC_PORT = 5900
 VNC_PASSWORD = "111111"
 
+# Modbus input register addresses
+REG_ADDR_BUFFER_TANK_TEMP = 2
+REG_ADDR_HOT_WATER_TEMP = 3
+REG_ADDR_HP_INLET_TEMP = 4
+REG_ADDR_FLOW = 5
+REG_ADDR_COMPRESSOR_HEAD_TEMP = 6
+REG_ADDR_HP_OUTLET_TEMP = 7
+REG_ADDR_EXTERNAL_TEMP = 8
+REG_ADDR_DRAIN_TEMP = 9
+REG_ADDR_SUCTION_TEMP = 10
+REG_ADDR_HIGH_PRESSURE = 11
+REG_ADDR_LOW_PRESSURE = 12
+REG_ADDR_EVAPORATION = 13
+REG_ADDR_CONDENSATION = 14
+REG_ADDR_SH = 15
+REG_ADDR_COMPRESSOR_SPEED = 18
+REG_ADDR_COOLING_SETPOINT = 65
+REG_ADDR_HEATING_SETPOINT = 66
+REG_ADDR_HOT_WATER_SETPOINT = 67
+REG_ADDR_HEATING_COOLING_SETPOINT = 68
+REG_ADDR_EEV = 70
+REG_ADDR_INJ = 72
+REG_ADDR_TJ = 73
+REG_ADDR_ENERGY_CONSUMPTION = 234
+REG_ADDR_MODE = 1081
+
 # Setpoint step size per +/- click on HMI
 SETPOINT_STEP = 0.5
 
 # Max number of +/- clicks per operation (safety limit)
 MAX_SETPOINT_CLICKS = 40  # ±20°C
+
+# Raw poll trace file, relative to the HA config directory
+DEFAULT_TRACE_FILE = "templari_kita_trace.bin"
+
+# Trace replay speed limits (x real time)
+MIN_REPLAY_SPEED = 1
+MAX_REPLAY_SPEED = 1000
+
+# Longest poll gap (seconds) bridged by energy integration
+ENERGY_MAX_GAP = 90
+
+# Raw sampling rate of the fast register tier (seconds)
+FAST_POLL_INTERVAL = 5
+
+# Samples kept per register in the high-resolution ring (1 h at 5 s)
+SAMPLE_BUFFER_SIZE = 720
+
+# Options
+CONF_STATISTICS_MODE = "statistics_mode"
+
+# In statistics mode, entity states are written at least this often (seconds)
+# and otherwise only when they move by more than their deadband
+STATISTICS_PUBLISH_INTERVAL = 15 * 60
+
+# Register values older than this (seconds) are re-read by ad-hoc reads
+REGISTER_CACHE_TTL = 30
+
+# Ad-hoc read rate limit: sustained transactions per second and burst size
+ADHOC_READ_RATE = 1.0
+ADHOC_READ_BURST = 5
+
+# Largest register block a single Modbus read may request
+MAX_READ_COUNT = 125
+
+CONF_EXPLORER_MODE = "explorer_mode"
+
+# Explorer mode covers input registers [0, EXPLORER_END_ADDR)
+EXPLORER_END_ADDR = 1280
+# Enabled explorer registers this close together share one read transaction
+EXPLORER_MAX_GAP = 3
+
+# Full poll interval (seconds); polls start on wall-clock multiples of it
+POLL_INTERVAL = 30
+# Log polls that start later than this after their slot (seconds)
+POLL_MAX_LATENESS = 0.5
+
+# HMI mirror camera: wait this long for an incremental update per frame (seconds)
+HMI_MIRROR_UPDATE_TIMEOUT = 0.5
+# Seconds between frames while a viewer streams
+HMI_MIRROR_FRAME_INTERVAL = 1
+# Without a viewer for this long the session drops to a keep-alive update
+# every HMI_MIRROR_KEEPALIVE seconds, and closes after HMI_MIRROR_CLOSE_AFTER
+HMI_MIRROR_IDLE_AFTER = 30
+HMI_MIRROR_KEEPALIVE = 60
+HMI_MIRROR_CLOSE_AFTER = 600
+
+# Setpoint changes requested within this many seconds share one VNC session
+SETPOINT_BATCH_DELAY = 2.0
+
+# Weather compensation: heating setpoint = base + slope * (20 °C - outdoor),
+# clamped to [min, max]
+CONF_CURVE_ENABLED = "curve_enabled"
+CONF_CURVE_BASE = "curve_base"
+CONF_CURVE_SLOPE = "curve_slope"
+CONF_CURVE_MIN = "curve_min"
+CONF_CURVE_MAX = "curve_max"
+CONF_CURVE_HYSTERESIS = "curve_hysteresis"
+CONF_CURVE_MIN_STEP = "curve_min_step"
+DEFAULT_CURVE_BASE = 25.0
+DEFAULT_CURVE_SLOPE = 0.6
+DEFAULT_CURVE_MIN = 25.0
+DEFAULT_CURVE_MAX = 45.0
+DEFAULT_CURVE_HYSTERESIS = 1.0
+DEFAULT_CURVE_MIN_STEP = 1.0
+CURVE_REFERENCE_TEMP = 20.0
+# A written setpoint reaches the registers after ~30 s; don't re-plan before
+CURVE_SETTLE_TIME = 90
@@ -1,40 +1,328 @@
-from datetime import timedelta
+import asyncio
+from datetime import datetime
 import logging
-from . import modbus
+import time
+from typing import Awaitable, Callable, NamedTuple
+from . import const, modbus
+from .cycles import CycleDetector
+from .energy import EnergyMeter
+from .metrics import DerivedMetrics
+from .samples import RegisterSampler
+from .statistics import StatisticsAggregator
+from .trace import TraceRecorder
 
 from pymodbus.client import AsyncModbusTcpClient
+from pymodbus.exceptions import ModbusException
 
+from homeassistant.core import CALLBACK_TYPE, callback
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.util import dt as dt_util
 
 _LOGGER = logging.getLogger(__name__)
 
+STORAGE_VERSION = 1
+STORAGE_KEY = const.DOMAIN
+# Totals are written at most this often; the delay must stay under POLL_INTERVAL,
+# since every poll would otherwise push a pending delayed save further out
+STORAGE_SAVE_INTERVAL = 300
+STORAGE_SAVE_DELAY = 5
+
+
+class RangeRead(NamedTuple):
+    """When one read transaction completed, on both clocks."""
+    from_addr: int
+    count: int
+    monotonic: float
+    utc: datetime
+    ok: bool
+
+
+class KitaSnapshot(dict):
+    """Register values by address, plus the read transaction behind each value."""
+
+    def __init__(self, *args) -> None:
+        super().__init__(*args)
+        self.reads: list[RangeRead] = []
+        self._read_by_addr: dict[int, RangeRead] = {}
+
+    def add_read(self, read: RangeRead, regs: list[int] | None) -> None:
+        self.reads.append(read)
+        if regs:
+            for i, reg in enumerate(regs):
+                self[read.from_addr + i] = reg
+                self._read_by_addr[read.from_addr + i] = read
+        else:
+            for i in range(read.count):
+                self[read.from_addr + i] = None
+                self._read_by_addr[read.from_addr + i] = read
+
+    def read_of(self, addr: int) -> RangeRead | None:
+        return self._read_by_addr.get(addr)
+
+    def sample_time(self, addr: int, default: float) -> float:
+        """Monotonic time at which ``addr`` was read."""
+        read = self._read_by_addr.get(addr)
+        return default if read is None else read.monotonic
+
+    def updated(self, read: RangeRead, regs: list[int]) -> "KitaSnapshot":
+        """Copy with one more transaction applied on top."""
+        snapshot = KitaSnapshot(self)
+        snapshot.reads = [r for r in self.reads]
+        snapshot._read_by_addr = dict(self._read_by_addr)
+        snapshot.add_read(read, regs)
+        return snapshot
 
-# FROM_REGISTER_ADDR = 0
-# TO_REGISTER_ADDR = 1280
-# CHUNK_SIZE = 32
 
 class KitaCoordinator(DataUpdateCoordinator):
     """My custom coordinator."""
 
-    def __init__(self, hass, client: AsyncModbusTcpClient, register_ranges):
+    def __init__(self, hass, client: AsyncModbusTcpClient, register_ranges, fast_register_ranges=()):
         super().__init__(
             hass,
             _LOGGER,
             name="Templari Kita",
-            update_interval=timedelta(seconds=30),
+            # Polls are scheduled on wall-clock boundaries by async_start_polling
+            update_interval=None,
         )
         self.client = client
         self.register_ranges = register_ranges
+        self.fast_register_ranges = fast_register_ranges
+        # Explorer registers enabled by the user, polled on top of register_ranges
+        self.explorer_addresses: set[int] = set()
+        self._explorer_ranges: list[tuple[int, int]] = []
+        self.trace_recorder: TraceRecorder | None = None
+        self.replaying = False
+        self.replay_task: asyncio.Task | None = None
+        self.clock = time.monotonic
+        self.energy = EnergyMeter(const.ENERGY_MAX_GAP)
+        self.metrics = DerivedMetrics(const.ENERGY_MAX_GAP)
+        self.cycles = CycleDetector(const.ENERGY_MAX_GAP)
+        self.sampler = RegisterSampler(const.SAMPLE_BUFFER_SIZE)
+        self.statistics: StatisticsAggregator | None = None
+        # Weather compensation controller, set up when enabled in the options
+        self.curve = None
+        self.register_cache = modbus.RegisterCache()
+        self.adhoc_reader = modbus.CoalescingReader(
+            self.register_cache, const.ADHOC_READ_RATE, const.ADHOC_READ_BURST
+        )
+        # Held for the length of a poll or sample; a replay holds both while swapped in
+        self._poll_lock = asyncio.Lock()
+        self._sample_lock = asyncio.Lock()
+        # Called with {address: (raw value, read time)} after each fast-tier sample
+        self._sample_listeners: list[Callable[[dict[int, tuple[int | None, datetime]]], None]] = []
+        # Seconds between the wall-clock boundary and the start of the last poll
+        self.last_poll_lateness: float | None = None
+        self.last_poll_duration: float | None = None
+        # Bumped on every published snapshot, for consumers caching derived output
+        self.generation = 0
+        self._store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._stored_state: dict = {}
+        self._last_save = time.monotonic()
+
+    async def async_load_state(self) -> None:
+        """Restore persisted totals (call once before the first refresh)."""
+        self.restore_state(await self._store.async_load())
+
+    def restore_state(self, stored: dict | None = None) -> None:
+        """Restore totals from storage, or from the last saved state if omitted."""
+        if stored is None:
+            stored = self._stored_state
+        self._stored_state = stored or {}
+        self.energy = EnergyMeter(const.ENERGY_MAX_GAP)
+        self.energy.restore(self._stored_state.get("energy"))
+        self.metrics = DerivedMetrics(const.ENERGY_MAX_GAP)
+        self.metrics.restore(self._stored_state.get("metrics"))
+        self.cycles = CycleDetector(const.ENERGY_MAX_GAP)
+        self.cycles.restore(self._stored_state.get("cycles"))
+
+    def _save_state(self) -> None:
+        state = {
+            "energy": self.energy.as_dict(),
+            "metrics": self.metrics.as_dict(),
+            "cycles": self.cycles.as_dict(),
+        }
+        self._stored_state = state
+        now = time.monotonic()
+        if now - self._last_save >= STORAGE_SAVE_INTERVAL:
+            self._last_save = now
+            self._store.async_delay_save(lambda: state, STORAGE_SAVE_DELAY)
+
+    async def async_save_state(self) -> None:
+        """Write the latest totals now, e.g. before the entry is unloaded."""
+        if self._stored_state:
+            self._last_save = time.monotonic()
+            await self._store.async_save(self._stored_state)
+
+    @callback
+    def _async_track_aligned(
+            self, interval: float, action: Callable[[float], Awaitable[None]]
+    ) -> CALLBACK_TYPE:
+        """Run ``action(boundary)`` at every wall-clock multiple of ``interval``.
+
+        Each wake-up is re-derived from the wall clock, so polls never drift;
+        the remaining jitter is the event loop's scheduling latency.
+        """
+        handle = None
+
+        def schedule() -> None:
+            nonlocal handle
+            now = time.time()
+            boundary = (now // interval + 1) * interval
+            handle = self.hass.loop.call_later(boundary - now, fire, boundary)
+
+        def fire(boundary: float) -> None:
+            schedule()
+            self.hass.async_create_task(action(boundary))
+
+        schedule()
+        return lambda: handle.cancel()
+
+    def async_start_polling(self) -> CALLBACK_TYPE:
+        """Start full polls and fast sampling; returns the unsubscriber."""
+        unsub_poll = self._async_track_aligned(const.POLL_INTERVAL, self._async_aligned_poll)
+        unsub_sample = self._async_track_aligned(const.FAST_POLL_INTERVAL, self._async_sample)
+
+        def unsub() -> None:
+            unsub_poll()
+            unsub_sample()
+
+        return unsub
+
+    async def _async_aligned_poll(self, boundary: float) -> None:
+        # A replay drives refreshes itself; an overrunning poll just skips a slot
+        if self.replaying or self._poll_lock.locked():
+            return
+        async with self._poll_lock:
+            self.last_poll_lateness = time.time() - boundary
+            if self.last_poll_lateness > const.POLL_MAX_LATENESS:
+                _LOGGER.debug(f"Poll started {self.last_poll_lateness:.3f}s after its slot")
+            await self.async_refresh()
+
+    def enable_explorer_address(self, address: int) -> None:
+        self.explorer_addresses.add(address)
+        self._rebuild_read_plan()
+
+    def disable_explorer_address(self, address: int) -> None:
+        self.explorer_addresses.discard(address)
+        self._rebuild_read_plan()
+
+    def _rebuild_read_plan(self) -> None:
+        # Registers the regular ranges already cover need no extra transaction
+        addresses = {
+            addr for addr in self.explorer_addresses
+            if not any(from_addr <= addr <= to_addr for from_addr, to_addr in self.register_ranges)
+        }
+        self._explorer_ranges = modbus.build_read_plan(
+            addresses, const.EXPLORER_MAX_GAP, const.MAX_READ_COUNT
+        )
+
+    async def async_read_registers(self, address: int, count: int, max_age: float) -> dict[int, int | None]:
+        """Ad-hoc read through the shared cache, rate-limited behind polling."""
+        return await self.adhoc_reader.read(self.client, address, count, max_age)
+
+    @property
+    def request_queue(self) -> modbus.RequestQueue:
+        return modbus.get_queue(self.client)
+
+    def _completed_read(self, from_addr: int, count: int, regs: list[int] | None) -> RangeRead:
+        return RangeRead(from_addr, count, self.clock(), dt_util.utcnow(), bool(regs))
+
+    async def async_confirm_register(self, address: int) -> None:
+        """Re-read one register ahead of any queued polls and publish it."""
+        if self.replaying:
+            return
+        try:
+            value = await modbus.read_register(self.client, address, modbus.PRIORITY_CONFIRM)
+        except (ModbusException, modbus.ClientException) as e:
+            # Scheduled and forgotten by the writer; the next poll reads it anyway
+            _LOGGER.debug(f"Confirming register {address} failed: {e}")
+            return
+        if value is None or self.data is None or self.replaying:
+            return
+        read = self._completed_read(address, 1, [value])
+        self.register_cache.put(address, [value], read.monotonic)
+        self.generation += 1
+        self.async_set_updated_data(self.data.updated(read, [value]))
+
+    @callback
+    def async_add_sample_listener(
+            self, listener: Callable[[dict[int, tuple[int | None, datetime]]], None]
+    ) -> CALLBACK_TYPE:
+        """Listen for fast-tier samples, which never reach coordinator listeners."""
+        self._sample_listeners.append(listener)
+        return lambda: self._sample_listeners.remove(listener)
+
+    async def _async_sample(self, boundary: float | None = None) -> None:
+        # Skip a tick rather than queue up behind a sample still in flight
+        if self.replaying or self._sample_lock.locked():
+            return
+        async with self._sample_lock:
+            samples = {}
+            for (from_addr, to_addr) in self.fast_register_ranges:
+                count = to_addr - from_addr + 1
+                try:
+                    regs = await modbus.read_registers(self.client, from_addr, count, modbus.PRIORITY_FAST)
+                except (ModbusException, modbus.ClientException) as e:
+                    # Nobody awaits this task; the next full poll reports the outage
+                    _LOGGER.debug(f"Fast sample of registers {from_addr}-{to_addr} failed: {e}")
+                    regs = None
+                timestamp = self.clock()
+                if not regs:
+                    self.sampler.add_gap(timestamp, from_addr, count)
+                    continue
+                self.register_cache.put(from_addr, regs, timestamp)
+                self.sampler.add(timestamp, from_addr, regs)
+                utc = dt_util.utcnow()
+                for i, reg in enumerate(regs):
+                    samples[from_addr + i] = (reg, utc)
+            if samples:
+                for listener in list(self._sample_listeners):
+                    listener(samples)
 
     async def _async_update_data(self):
-        data = {}
-        for (from_addr, to_addr) in self.register_ranges:
+        data = KitaSnapshot()
+        reads = []
+        timestamp = self.clock()
+        started = time.monotonic()
+        for (from_addr, to_addr) in self.register_ranges + self._explorer_ranges:
             count = to_addr - from_addr + 1
-            regs = await modbus.read_registers(self.client, from_addr, count)
-            if regs and len(regs) > 0:
-                for i, reg in enumerate(regs):
-                    data[from_addr + i] = reg
-            else:
-                for i in range(count):
-                    data[from_addr + i] = None
+            regs = await modbus.read_registers(self.client, from_addr, count, modbus.PRIORITY_SLOW)
+            if not regs:
+                regs = None
+            data.add_read(self._completed_read(from_addr, count, regs), regs)
+            reads.append((from_addr, count, regs))
+        self.last_poll_duration = time.monotonic() - started
+        self.generation += 1
+        if not self.replaying:
+            for read, (from_addr, _, regs) in zip(data.reads, reads):
+                self.register_cache.put(from_addr, regs, read.monotonic)
+                if regs is None:
+                    self.sampler.add_gap(read.monotonic, from_addr, read.count)
+                else:
+                    self.sampler.add(read.monotonic, from_addr, regs)
+            self.sampler.publish()
+        if self.trace_recorder is not None:
+            self.trace_recorder.record(timestamp, reads)
+
+        today = dt_util.now().date()
+        self.energy.update(
+            data.sample_time(const.REG_ADDR_ENERGY_CONSUMPTION, timestamp),
+            today,
+            data.get(const.REG_ADDR_ENERGY_CONSUMPTION),
+            data.get(const.REG_ADDR_MODE),
+        )
+        cycle_time = data.sample_time(const.REG_ADDR_COMPRESSOR_SPEED, timestamp)
+        for event_type, event_data in self.cycles.update(cycle_time, today, data):
+            # Automations must not react to replayed cycles
+            if not self.replaying:
+                self.hass.bus.async_fire(event_type, event_data)
+        self.metrics.update(
+            data.sample_time(const.REG_ADDR_ENERGY_CONSUMPTION, timestamp), data, self.cycles.defrosting
+        )
+        # Replayed polls drive the entities but never reach storage
+        if not self.replaying:
+            self._save_state()
+            if self.statistics is not None:
+                self.statistics.update(data.reads[0].utc if data.reads else dt_util.utcnow(), data)
         return data
@@ -0,0 +1,137 @@
+"""Weather compensation: heating setpoint planned from the outdoor temperature."""
+
+from __future__ import annotations
+
+import logging
+import time
+from typing import NamedTuple
+
+from homeassistant.core import HomeAssistant, callback
+
+from . import const
+from .coordinator import KitaCoordinator
+from .modbus import get_2comp
+from .setpoints import SetpointWriter
+
+_LOGGER = logging.getLogger(__name__)
+
+# Key of the heating setpoint on the SET MANUAL dialog
+HEATING_SETPOINT = "winter"
+
+
+def _round_step(value: float) -> float:
+    return round(value / const.SETPOINT_STEP) * const.SETPOINT_STEP
+
+
+class HeatingCurve(NamedTuple):
+    base: float
+    slope: float
+    minimum: float
+    maximum: float
+
+    def setpoint(self, outdoor: float) -> float:
+        value = self.base + self.slope * (const.CURVE_REFERENCE_TEMP - outdoor)
+        return min(max(value, self.minimum), self.maximum)
+
+
+class CurveController:
+    """Plans heating setpoint changes and writes them only when worthwhile.
+
+    The outdoor temperature the plan follows only moves once the reading has
+    drifted ``hysteresis`` from it, and the setpoint is only written once the
+    planned change has accumulated to ``min_step``. For comparison the
+    controller counts the writes a naive automation would make, one per
+    change of the step-rounded curve value.
+    """
+
+    def __init__(
+            self,
+            hass: HomeAssistant,
+            coordinator: KitaCoordinator,
+            writer: SetpointWriter,
+            curve: HeatingCurve,
+            hysteresis: float,
+            min_step: float,
+    ) -> None:
+        self.hass = hass
+        self.coordinator = coordinator
+        self.writer = writer
+        self.curve = curve
+        self.hysteresis = hysteresis
+        self.min_step = max(min_step, const.SETPOINT_STEP)
+        # Outdoor temperature the current plan follows
+        self.outdoor: float | None = None
+        self.target: float | None = None
+        self.pending_clicks = 0
+        self.sessions = 0
+        self.naive_writes = 0
+        self._naive_setpoint: float | None = None
+        self._written: float | None = None
+        self._settle_until = 0.0
+        self._writing = False
+
+    @property
+    def avoided_sessions(self) -> int:
+        return max(0, self.naive_writes - self.sessions)
+
+    def plan(self, now: float, outdoor: float, setpoint: float) -> int:
+        """Clicks to write now, or 0 to keep accumulating."""
+        setpoint = _round_step(setpoint)
+
+        naive = _round_step(self.curve.setpoint(outdoor))
+        if self._naive_setpoint is None:
+            self._naive_setpoint = setpoint
+        if naive != self._naive_setpoint:
+            self.naive_writes += 1
+            self._naive_setpoint = naive
+
+        if self.outdoor is None or abs(outdoor - self.outdoor) >= self.hysteresis:
+            self.outdoor = outdoor
+        self.target = _round_step(self.curve.setpoint(self.outdoor))
+        self.pending_clicks = round((self.target - setpoint) / const.SETPOINT_STEP)
+
+        # The last write may not have reached the registers yet
+        if now < self._settle_until and setpoint != self._written:
+            return 0
+        if abs(self.target - setpoint) < self.min_step:
+            return 0
+        return max(-const.MAX_SETPOINT_CLICKS, min(const.MAX_SETPOINT_CLICKS, self.pending_clicks))
+
+    def attributes(self) -> dict:
+        return {
+            "target": self.target,
+            "outdoor": self.outdoor,
+            "pending_clicks": self.pending_clicks,
+            "sessions": self.sessions,
+            "naive_writes": self.naive_writes,
+        }
+
+    @callback
+    def async_on_update(self) -> None:
+        coordinator = self.coordinator
+        # Replays must never reach the HMI
+        if coordinator.replaying or coordinator.data is None or self._writing:
+            return
+        outdoor = coordinator.data.get(const.REG_ADDR_EXTERNAL_TEMP)
+        setpoint = coordinator.data.get(const.REG_ADDR_HEATING_SETPOINT)
+        if outdoor is None or setpoint is None:
+            return
+        clicks = self.plan(time.monotonic(), get_2comp(outdoor) * 0.1, get_2comp(setpoint) * 0.1)
+        if clicks:
+            self._writing = True
+            self.hass.async_create_task(self._async_write(clicks))
+
+    async def _async_write(self, clicks: int) -> None:
+        _LOGGER.info(f"Heating curve: setpoint -> {self.target:.1f} ({clicks:+d} clicks)")
+        try:
+            await self.writer.async_adjust(HEATING_SETPOINT, clicks)
+        except Exception:
+            _LOGGER.exception("Failed to write heating curve setpoint")
+            self._written = None
+        else:
+            self.sessions += 1
+            self._written = self.target
+        finally:
+            # Also spaces out retries after a failed session
+            self._settle_until = time.monotonic() + const.CURVE_SETTLE_TIME
+            self._writing = False
@@ -0,0 +1,171 @@
+"""Compressor cycle and defrost detection, fed one snapshot at a time."""
+
+from __future__ import annotations
+
+from collections import deque
+from datetime import date
+
+from . import const
+from .modbus import get_2comp
+
+EVENT_COMPRESSOR_START = f"{const.DOMAIN}_compressor_start"
+EVENT_COMPRESSOR_STOP = f"{const.DOMAIN}_compressor_stop"
+EVENT_DEFROST_START = f"{const.DOMAIN}_defrost_start"
+EVENT_DEFROST_END = f"{const.DOMAIN}_defrost_end"
+EVENT_SHORT_CYCLING = f"{const.DOMAIN}_short_cycling"
+
+# Cycles shorter than this (seconds) count as short cycles
+SHORT_CYCLE_DURATION = 10 * 60
+# Alert when this many short cycles happen within SHORT_CYCLE_WINDOW seconds
+SHORT_CYCLE_ALERT_COUNT = 3
+SHORT_CYCLE_WINDOW = 60 * 60
+
+# Reverse-cycle defrost: compressor running, water leaving colder than it
+# entered (K) while it is cold enough outside (°C) to rule out cooling mode
+DEFROST_DELTA = 1.0
+DEFROST_MAX_EXTERNAL_TEMP = 10.0
+
+# Upper bounds (minutes) of the cycle duration histogram bins; last bin is open
+HISTOGRAM_BINS = (5, 10, 20, 40, 80)
+
+# Days of daily aggregates kept in storage
+HISTORY_DAYS = 31
+
+
+def _new_day(day: date | None) -> dict:
+    return {
+        "day": day.isoformat() if day else None,
+        "starts": 0,
+        "short_cycles": 0,
+        "defrosts": 0,
+        "runtime": 0.0,
+        "histogram": [0] * (len(HISTOGRAM_BINS) + 1),
+    }
+
+
+def _histogram_bin(duration: float) -> int:
+    minutes = duration / 60
+    for i, bound in enumerate(HISTOGRAM_BINS):
+        if minutes < bound:
+            return i
+    return len(HISTOGRAM_BINS)
+
+
+class CycleDetector:
+    """Tracks compressor cycles and defrosts with O(1) work per snapshot."""
+
+    def __init__(self, max_gap: float) -> None:
+        self.max_gap = max_gap
+        self.running: bool | None = None
+        self.defrosting = False
+        self.short_cycling = False
+        self.starts_total = 0
+        self.last_cycle_duration: float | None = None
+        self.today = _new_day(None)
+        self.history: deque[dict] = deque(maxlen=HISTORY_DAYS)
+        self._cycle_start: float | None = None
+        self._last_time: float | None = None
+        self._short_cycles: deque[float] = deque(maxlen=SHORT_CYCLE_ALERT_COUNT)
+
+    def update(self, timestamp: float, today: date, data: dict) -> list[tuple[str, dict]]:
+        """Advance the state machine and return the events to fire."""
+        events = []
+        if today.isoformat() != self.today["day"]:
+            if self.today["day"] is not None:
+                self.history.append(self.today)
+            self.today = _new_day(today)
+
+        speed = data.get(const.REG_ADDR_COMPRESSOR_SPEED)
+        if speed is None:
+            # Unknown state: don't count run time across the gap
+            self._last_time = None
+            return events
+        running = speed > 0
+
+        if self.running and self._last_time is not None and timestamp - self._last_time <= self.max_gap:
+            self.today["runtime"] += timestamp - self._last_time
+        self._last_time = timestamp
+
+        if self.running is None:
+            # First sample after start-up; the cycle in progress has no known start
+            self.running = running
+        elif running and not self.running:
+            self.running = True
+            self._cycle_start = timestamp
+            self.starts_total += 1
+            self.today["starts"] += 1
+            events.append((EVENT_COMPRESSOR_START, {}))
+        elif not running and self.running:
+            self.running = False
+            events.append((EVENT_COMPRESSOR_STOP, self._end_cycle(timestamp)))
+
+        defrosting = running and self._is_defrost(data)
+        if defrosting != self.defrosting:
+            self.defrosting = defrosting
+            if defrosting:
+                self.today["defrosts"] += 1
+                events.append((EVENT_DEFROST_START, {}))
+            else:
+                events.append((EVENT_DEFROST_END, {}))
+
+        if not self.short_cycling and self._short_cycles_in_window(timestamp):
+            self.short_cycling = True
+            events.append((EVENT_SHORT_CYCLING, {"count": len(self._short_cycles)}))
+        elif self.short_cycling and not self._short_cycles_in_window(timestamp):
+            self.short_cycling = False
+        return events
+
+    def _end_cycle(self, timestamp: float) -> dict:
+        if self._cycle_start is None:
+            return {}
+        duration = timestamp - self._cycle_start
+        self._cycle_start = None
+        self.last_cycle_duration = duration
+        self.today["histogram"][_histogram_bin(duration)] += 1
+        short = duration < SHORT_CYCLE_DURATION
+        if short:
+            self.today["short_cycles"] += 1
+            self._short_cycles.append(timestamp)
+        return {"duration": round(duration), "short": short}
+
+    def _short_cycles_in_window(self, timestamp: float) -> bool:
+        return (
+            len(self._short_cycles) == SHORT_CYCLE_ALERT_COUNT
+            and timestamp - self._short_cycles[0] <= SHORT_CYCLE_WINDOW
+        )
+
+    @staticmethod
+    def _is_defrost(data: dict) -> bool:
+        inlet = data.get(const.REG_ADDR_HP_INLET_TEMP)
+        outlet = data.get(const.REG_ADDR_HP_OUTLET_TEMP)
+        external = data.get(const.REG_ADDR_EXTERNAL_TEMP)
+        if inlet is None or outlet is None or external is None:
+            return False
+        return (
+            get_2comp(external) * 0.1 <= DEFROST_MAX_EXTERNAL_TEMP
+            and (get_2comp(inlet) - get_2comp(outlet)) * 0.1 >= DEFROST_DELTA
+        )
+
+    def histogram_attributes(self) -> dict:
+        bounds = (0,) + HISTOGRAM_BINS
+        attrs = {
+            f"cycles_{low}_{high}_min": count
+            for low, high, count in zip(bounds, HISTOGRAM_BINS, self.today["histogram"])
+        }
+        attrs[f"cycles_over_{HISTOGRAM_BINS[-1]}_min"] = self.today["histogram"][-1]
+        return attrs
+
+    def as_dict(self) -> dict:
+        return {
+            "starts_total": self.starts_total,
+            "today": dict(self.today, histogram=list(self.today["histogram"])),
+            "history": list(self.history),
+        }
+
+    def restore(self, stored: dict | None) -> None:
+        if not stored:
+            return
+        self.starts_total = stored.get("starts_total", 0)
+        if today := stored.get("today"):
+            self.today = dict(today, histogram=list(today["histogram"]))
+        self.history.extend(stored.get("history", []))
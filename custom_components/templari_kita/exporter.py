@@ -0,0 +1,136 @@
+"""OpenMetrics exporter for the latest coordinator snapshot."""
+
+from __future__ import annotations
+
+import sys
+from http import HTTPStatus
+
+from aiohttp import web
+
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.core import HomeAssistant
+from homeassistant.util import slugify
+
+from . import const
+from .coordinator import KitaCoordinator, KitaSnapshot
+from .modbus import get_2comp
+from .registers import SENSOR_TYPES
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+PREFIX = const.DOMAIN
+
+
+class _Family:
+    """Collects the samples of one metric family."""
+
+    def __init__(self, lines: list[str], name: str, kind: str, help_text: str, unit: str | None = None) -> None:
+        self.lines = lines
+        self.name = f"{PREFIX}_{name}"
+        lines.append(f"# TYPE {self.name} {kind}")
+        if unit:
+            lines.append(f"# UNIT {self.name} {unit}")
+        lines.append(f"# HELP {self.name} {help_text}")
+        self.suffix = "_total" if kind == "counter" else ""
+
+    def add(self, value, labels: dict | None = None, timestamp: float | None = None) -> None:
+        if value is None:
+            return
+        label_text = ""
+        if labels:
+            label_text = "{" + ",".join(f'{k}="{v}"' for k, v in labels.items()) + "}"
+        line = f"{self.name}{self.suffix}{label_text} {value}"
+        if timestamp is not None:
+            line += f" {timestamp:.3f}"
+        self.lines.append(line)
+
+
+def render(coordinator: KitaCoordinator) -> bytes:
+    lines: list[str] = []
+    data = coordinator.data or KitaSnapshot()
+
+    def read_time(addr: int) -> float | None:
+        read = data.read_of(addr)
+        return read.utc.timestamp() if read is not None else None
+
+    raw = _Family(lines, "register_raw", "gauge", "Raw input register value.")
+    for addr in sorted(data):
+        raw.add(data[addr], {"address": addr}, read_time(addr))
+
+    decoded = _Family(lines, "register_value", "gauge", "Decoded input register value.")
+    for descr in SENSOR_TYPES:
+        if (value := data.get(descr.key)) is None:
+            continue
+        value = get_2comp(value) * (descr.multiplier or 1)
+        labels = {"address": descr.key, "name": slugify(descr.name)}
+        if descr.native_unit_of_measurement:
+            labels["unit"] = descr.native_unit_of_measurement
+        decoded.add(round(value, 3), labels, read_time(descr.key))
+
+    _Family(lines, "energy_kwh", "counter", "Integrated electric energy.", "kwh").add(
+        round(coordinator.energy.total_kwh, 6)
+    )
+    metrics = coordinator.metrics
+    _Family(lines, "thermal_power_kw", "gauge", "Thermal output power.", "kw").add(
+        None if metrics.thermal_kw is None else round(metrics.thermal_kw, 3)
+    )
+    _Family(lines, "cop", "gauge", "Instantaneous coefficient of performance.").add(
+        None if metrics.cop is None else round(metrics.cop, 3)
+    )
+    _Family(lines, "compressor_starts", "counter", "Compressor starts.").add(coordinator.cycles.starts_total)
+
+    _Family(lines, "poll_duration_seconds", "gauge", "Duration of the last full poll.", "seconds").add(
+        coordinator.last_poll_duration
+    )
+    _Family(lines, "poll_lateness_seconds", "gauge", "Start of the last poll after its wall-clock slot.", "seconds").add(
+        coordinator.last_poll_lateness
+    )
+    _Family(lines, "snapshot_generation", "gauge", "Published snapshot counter.").add(coordinator.generation)
+
+    queue_metrics = coordinator.request_queue.metrics()
+    depth = _Family(lines, "modbus_queue_depth", "gauge", "Queued Modbus requests per priority class.")
+    requests = _Family(lines, "modbus_requests", "counter", "Modbus requests served per priority class.")
+    max_wait = _Family(lines, "modbus_max_wait_seconds", "gauge", "Longest queue wait per priority class.", "seconds")
+    misses = _Family(lines, "modbus_deadline_misses", "counter", "Requests served after their deadline.")
+    for name, stats in queue_metrics.items():
+        labels = {"class": name}
+        depth.add(stats["depth"], labels)
+        requests.add(stats["requests"], labels)
+        max_wait.add(stats["max_wait_ms"] / 1000, labels)
+        misses.add(stats["deadline_misses"], labels)
+
+    # The VNC module loads with the first write; until then there is nothing to report
+    vnc = sys.modules.get(f"{__package__}.vnc")
+    _Family(lines, "vnc_sessions", "counter", "VNC write sessions.").add(vnc.STATS.sessions if vnc else 0)
+    _Family(lines, "vnc_failures", "counter", "Failed VNC write sessions.").add(vnc.STATS.failures if vnc else 0)
+    _Family(lines, "vnc_session_seconds", "counter", "Time spent in VNC write sessions.", "seconds").add(
+        round(vnc.STATS.total_duration, 3) if vnc else 0
+    )
+    _Family(lines, "vnc_last_session_seconds", "gauge", "Duration of the last VNC write session.", "seconds").add(
+        vnc.STATS.last_duration if vnc else None
+    )
+
+    lines.append("# EOF\n")
+    return "\n".join(lines).encode()
+
+
+class KitaMetricsView(HomeAssistantView):
+    """Serves the OpenMetrics text, rendered at most once per snapshot."""
+
+    url = f"/api/{const.DOMAIN}/metrics"
+    name = f"api:{const.DOMAIN}:metrics"
+    requires_auth = True
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+        self._cache: tuple[int, int, bytes] | None = None
+
+    async def get(self, request: web.Request) -> web.Response:
+        entries = self.hass.data.get(const.DOMAIN)
+        if not entries:
+            return web.Response(status=HTTPStatus.SERVICE_UNAVAILABLE)
+        coordinator = next(iter(entries.values()))["coordinator"]
+        key = (id(coordinator), coordinator.generation)
+        if self._cache is None or self._cache[:2] != key:
+            self._cache = (*key, render(coordinator))
+        return web.Response(body=self._cache[2], headers={"Content-Type": CONTENT_TYPE})
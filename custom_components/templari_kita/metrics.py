@@ -0,0 +1,158 @@
+"""Derived heat pump metrics computed once per coordinator snapshot."""
+
+from __future__ import annotations
+
+from array import array
+
+from . import const
+from .energy import JOULES_PER_KWH, TrapezoidIntegrator
+from .modbus import get_2comp
+
+# Specific heat capacity of water (kJ/(kg*K)), at ~1 kg per litre
+WATER_HEAT_CAPACITY = 4.186
+
+# Below this electric power (W) the COP is meaningless (standby, pumps only)
+MIN_COP_POWER = 100
+
+WINDOW_5_MIN = "5min"
+WINDOW_1_H = "1h"
+WINDOW_24_H = "24h"
+
+AVERAGE_WINDOWS = {
+    WINDOW_5_MIN: 5 * 60,
+    WINDOW_1_H: 60 * 60,
+    WINDOW_24_H: 24 * 60 * 60,
+}
+
+
+class RollingMean:
+    """Time-windowed mean over a fixed ring of buckets.
+
+    The window is split into ``buckets`` equal slots, each holding the sum and
+    count of the samples that fell into it, so memory is fixed regardless of
+    poll rate and each sample costs O(1) amortised.
+    """
+
+    def __init__(self, window: float, buckets: int = 60) -> None:
+        self.width = window / buckets
+        self._sums = array("d", bytes(8 * buckets))
+        self._counts = array("L", [0] * buckets)
+        self._index: int | None = None
+        self._sum = 0.0
+        self._count = 0
+
+    def add(self, timestamp: float, value: float | None) -> None:
+        index = int(timestamp // self.width)
+        self._advance(index)
+        if value is None:
+            return
+        slot = index % len(self._sums)
+        self._sums[slot] += value
+        self._counts[slot] += 1
+        self._sum += value
+        self._count += 1
+
+    def _advance(self, index: int) -> None:
+        if self._index is not None and index <= self._index:
+            return
+        size = len(self._sums)
+        start = index - size + 1 if self._index is None else max(self._index + 1, index - size + 1)
+        for i in range(start, index + 1):
+            slot = i % size
+            self._sum -= self._sums[slot]
+            self._count -= self._counts[slot]
+            self._sums[slot] = 0.0
+            self._counts[slot] = 0
+        self._index = index
+
+    @property
+    def mean(self) -> float | None:
+        if self._count == 0:
+            return None
+        return self._sum / self._count
+
+
+def _temp(data: dict, addr: int) -> float | None:
+    raw = data.get(addr)
+    return None if raw is None else get_2comp(raw) * 0.1
+
+
+class DerivedMetrics:
+    """Thermal output, COP and refrigerant-cycle figures from one snapshot."""
+
+    def __init__(self, max_gap: float) -> None:
+        self.thermal_kw: float | None = None
+        self.cop: float | None = None
+        self.condensing_approach: float | None = None
+        self.evaporating_approach: float | None = None
+        self.thermal_kwh = 0.0
+        self.electric_kwh = 0.0
+        self.averages = {
+            "thermal_kw": {name: RollingMean(window) for name, window in AVERAGE_WINDOWS.items()},
+            "cop": {name: RollingMean(window) for name, window in AVERAGE_WINDOWS.items()},
+        }
+        self._thermal = TrapezoidIntegrator(max_gap)
+        self._electric = TrapezoidIntegrator(max_gap)
+
+    @property
+    def scop(self) -> float | None:
+        """Seasonal COP: heat moved over electricity used since tracking began."""
+        if self.electric_kwh <= 0:
+            return None
+        return self.thermal_kwh / self.electric_kwh
+
+    def average(self, metric: str, window: str) -> float | None:
+        return self.averages[metric][window].mean
+
+    def update(self, timestamp: float, data: dict, defrosting: bool = False) -> None:
+        flow = data.get(const.REG_ADDR_FLOW)
+        inlet = _temp(data, const.REG_ADDR_HP_INLET_TEMP)
+        outlet = _temp(data, const.REG_ADDR_HP_OUTLET_TEMP)
+        power = data.get(const.REG_ADDR_ENERGY_CONSUMPTION)
+
+        # Positive when heating, negative when cooling or defrosting
+        self.thermal_kw = None
+        if flow is not None and inlet is not None and outlet is not None:
+            self.thermal_kw = flow * 0.1 / 60 * WATER_HEAT_CAPACITY * (outlet - inlet)
+
+        self.cop = None
+        if self.thermal_kw is not None and power is not None and power >= MIN_COP_POWER:
+            self.cop = abs(self.thermal_kw) * 1000 / power
+
+        # Only integrate when both sides are known so the ratio stays consistent.
+        # Cooling counts as heat moved; heat pulled back out of the water by a
+        # defrost is subtracted
+        if self.thermal_kw is not None and power is not None:
+            moved = self.thermal_kw if defrosting else abs(self.thermal_kw)
+            self.thermal_kwh += self._thermal.add(timestamp, moved) / 3600
+            self.electric_kwh += self._electric.add(timestamp, power) / JOULES_PER_KWH
+        else:
+            self._thermal.add(timestamp, None)
+            self._electric.add(timestamp, None)
+
+        condensation = _temp(data, const.REG_ADDR_CONDENSATION)
+        evaporation = _temp(data, const.REG_ADDR_EVAPORATION)
+        external = _temp(data, const.REG_ADDR_EXTERNAL_TEMP)
+        self.condensing_approach = None
+        if condensation is not None and outlet is not None:
+            self.condensing_approach = condensation - outlet
+        self.evaporating_approach = None
+        if evaporation is not None and external is not None:
+            self.evaporating_approach = external - evaporation
+
+        for mean in self.averages["thermal_kw"].values():
+            mean.add(timestamp, self.thermal_kw)
+        for mean in self.averages["cop"].values():
+            mean.add(timestamp, self.cop)
+
+    def as_dict(self) -> dict:
+        return {
+            "thermal_kwh": self.thermal_kwh,
+            "electric_kwh": self.electric_kwh,
+        }
+
+    def restore(self, stored: dict | None) -> None:
+        if not stored:
+            return
+        self.thermal_kwh = stored.get("thermal_kwh", 0.0)
+        self.electric_kwh = stored.get("electric_kwh", 0.0)
@@ -1,4 +1,8 @@
+import asyncio
+import heapq
+import itertools
 import time
+import weakref
 
 from pymodbus.client import AsyncModbusTcpClient
 from pymodbus import ExceptionResponse
@@ -11,7 +15,122 @@ class ClientException(Exception):
         self.error = error
 
 
-async def read_registers(client, address, count) -> [int]:
+def get_2comp(value):
+    return value - 2 ** 16 if value & 2 ** 15 else value
+
+
+# Request classes, most urgent first
+PRIORITY_CONFIRM = 0  # user-triggered confirmation reads
+PRIORITY_FAST = 1  # fast-tier telemetry
+PRIORITY_SLOW = 2  # regular polls
+PRIORITY_SCAN = 3  # background sweeps
+
+PRIORITY_NAMES = {
+    PRIORITY_CONFIRM: "confirm",
+    PRIORITY_FAST: "fast",
+    PRIORITY_SLOW: "slow",
+    PRIORITY_SCAN: "scan",
+}
+
+# Deadline (seconds after submission) per class; the queue serves the
+# earliest deadline first, so classes are strictly ordered under normal load
+# while a long-waiting scan chunk still can't starve forever.
+PRIORITY_DEADLINES = {
+    PRIORITY_CONFIRM: 0.5,
+    PRIORITY_FAST: 2.0,
+    PRIORITY_SLOW: 10.0,
+    PRIORITY_SCAN: 60.0,
+}
+
+
+class QueueStats:
+    __slots__ = ("depth", "requests", "total_wait", "max_wait", "deadline_misses")
+
+    def __init__(self):
+        self.depth = 0
+        self.requests = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.deadline_misses = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "depth": self.depth,
+            "requests": self.requests,
+            "mean_wait_ms": round(1000 * self.total_wait / self.requests, 1) if self.requests else None,
+            "max_wait_ms": round(1000 * self.max_wait, 1),
+            "deadline_misses": self.deadline_misses,
+        }
+
+
+class RequestQueue:
+    """Serialises all reads on one client, earliest deadline first.
+
+    Only a weak reference to the client is kept, so the per-client queue
+    registry can drop both once the client is gone.
+    """
+
+    def __init__(self, client):
+        self._client = weakref.ref(client)
+        self.stats = {priority: QueueStats() for priority in PRIORITY_NAMES}
+        self._heap = []
+        self._seq = itertools.count()
+        self._worker: asyncio.Task | None = None
+
+    @property
+    def depth(self) -> int:
+        return len(self._heap)
+
+    async def read(self, address: int, count: int, priority: int) -> list[int] | None:
+        submitted = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        deadline = submitted + PRIORITY_DEADLINES[priority]
+        heapq.heappush(self._heap, (deadline, priority, next(self._seq), address, count, submitted, future))
+        self.stats[priority].depth += 1
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+        return await future
+
+    async def _run(self) -> None:
+        while self._heap:
+            deadline, priority, _, address, count, submitted, future = heapq.heappop(self._heap)
+            stats = self.stats[priority]
+            stats.depth -= 1
+            if future.cancelled():
+                continue
+            started = time.monotonic()
+            wait = started - submitted
+            stats.requests += 1
+            stats.total_wait += wait
+            stats.max_wait = max(stats.max_wait, wait)
+            if started > deadline:
+                stats.deadline_misses += 1
+            try:
+                if (client := self._client()) is None:
+                    raise ClientException("Modbus client was closed")
+                result = await _read_registers_now(client, address, count)
+            except Exception as e:
+                if not future.cancelled():
+                    future.set_exception(e)
+            else:
+                if not future.cancelled():
+                    future.set_result(result)
+
+    def metrics(self) -> dict:
+        return {PRIORITY_NAMES[priority]: stats.as_dict() for priority, stats in self.stats.items()}
+
+
+_QUEUES: "weakref.WeakKeyDictionary[object, RequestQueue]" = weakref.WeakKeyDictionary()
+
+
+def get_queue(client) -> RequestQueue:
+    """The request queue shared by every caller of this client."""
+    if (queue := _QUEUES.get(client)) is None:
+        queue = _QUEUES[client] = RequestQueue(client)
+    return queue
+
+
+async def _read_registers_now(client, address, count) -> [int]:
     rr = await client.read_input_registers(address, count=count, device_id=1)
     if rr.isError() or isinstance(rr, ExceptionResponse):
         _LOGGER.warning(f"Modbus error while reading register {address} ({rr})")
@@ -19,37 +138,146 @@ async def read_registers(client, address, count) -> [int]:
     return rr.registers
 
 
-async def read_register(client, address) -> int | None:
-    registers = await read_registers(client, address, 1)
-    if len(registers) == 0:
+async def read_registers(client, address, count, priority=PRIORITY_SLOW) -> [int]:
+    return await get_queue(client).read(address, count, priority)
+
+
+async def read_register(client, address, priority=PRIORITY_CONFIRM) -> int | None:
+    registers = await read_registers(client, address, 1, priority)
+    if not registers:
         _LOGGER.warning(f"Empty Modbus response while reading register {address}")
         return None
     return registers[0]
 
 
+def build_read_plan(addresses, max_gap: int = 0, max_count: int = 125) -> list[tuple[int, int]]:
+    """Merge addresses into inclusive (from, to) ranges for as few reads as possible.
+
+    Neighbours up to ``max_gap`` unwanted registers apart share a range, as
+    long as the range stays within ``max_count`` registers.
+    """
+    ranges = []
+    for addr in sorted(addresses):
+        if ranges and addr - ranges[-1][1] - 1 <= max_gap and addr - ranges[-1][0] < max_count:
+            ranges[-1] = (ranges[-1][0], addr)
+        else:
+            ranges.append((addr, addr))
+    return ranges
+
+
+class RegisterCache:
+    """Last known value and read time per register address."""
+
+    def __init__(self):
+        self._values: dict[int, tuple[int, float]] = {}
+
+    def put(self, address: int, registers: list[int] | None, timestamp: float) -> None:
+        if not registers:
+            return
+        for i, reg in enumerate(registers):
+            self._values[address + i] = (reg, timestamp)
+
+    def get(self, address: int, max_age: float) -> int | None:
+        entry = self._values.get(address)
+        if entry is None or time.monotonic() - entry[1] > max_age:
+            return None
+        return entry[0]
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        while True:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class CoalescingReader:
+    """Serves ad-hoc reads from the cache, merging concurrent overlapping requests.
+
+    Addresses that are neither cached nor already being read are fetched in a
+    single rate-limited transaction at slow-poll priority; requests overlapping an in-flight read
+    wait for its result instead of issuing their own.
+    """
+
+    def __init__(self, cache: RegisterCache, rate: float, burst: int):
+        self.cache = cache
+        self.transactions = 0
+        self._bucket = TokenBucket(rate, burst)
+        self._inflight: dict[int, asyncio.Future] = {}
+
+    async def read(self, client, address: int, count: int, max_age: float) -> dict[int, int | None]:
+        result = {}
+        waits = {}
+        missing = []
+        for addr in range(address, address + count):
+            if (value := self.cache.get(addr, max_age)) is not None:
+                result[addr] = value
+            elif addr in self._inflight:
+                waits[addr] = self._inflight[addr]
+            else:
+                missing.append(addr)
+
+        if missing:
+            future = asyncio.get_running_loop().create_future()
+            span = range(missing[0], missing[-1] + 1)
+            owned = [addr for addr in span if addr not in self._inflight]
+            for addr in owned:
+                self._inflight[addr] = future
+            try:
+                await self._bucket.acquire()
+                timestamp = time.monotonic()
+                registers = await read_registers(client, span.start, len(span))
+                self.transactions += 1
+                self.cache.put(span.start, registers, timestamp)
+                values = {}
+                if registers:
+                    values = {span.start + i: reg for i, reg in enumerate(registers)}
+                future.set_result(values)
+            except BaseException as e:
+                # Also on cancellation of this caller, so coalesced waiters never hang
+                if not future.done():
+                    if not isinstance(e, Exception):
+                        e = ClientException("Shared register read was cancelled")
+                    future.set_exception(e)
+                    future.exception()  # waiters re-raise it; don't warn when there are none
+                raise
+            finally:
+                for addr in owned:
+                    del self._inflight[addr]
+            for addr in missing:
+                result[addr] = values.get(addr)
+
+        for addr, future in waits.items():
+            result[addr] = (await future).get(addr)
+        return result
+
+
 async def read_registers_chunked(client, from_adr, to_adr, chunk_size=32):
+    """Sweep a register span at scan priority, one queued request per chunk."""
     starttime = time.time()
     errors = 0
     for adr in range(from_adr, to_adr, chunk_size):
-        rr = await client.read_input_registers(adr, count=chunk_size, device_id=1)
-        error = False
-        if rr.isError():
-            error = True
-            print(f"regs[{adr}-{adr+chunk_size}] = modbus error({rr})")
-            _LOGGER.warning(f"registers[{adr}:{adr+chunk_size}] = modbus error({rr})")
-        if isinstance(rr, ExceptionResponse):
-            error = True
-            _LOGGER.warning(f"registers[{adr}:{adr+chunk_size}] = modbus error({rr})")
-        if len(rr.registers) == 0:
-            error = True
-            _LOGGER.warning(f"registers[{adr}:{adr+chunk_size}] = empty response")
-        if error:
+        count = min(chunk_size, to_adr - adr)
+        registers = await read_registers(client, adr, count, PRIORITY_SCAN)
+        if not registers:
             errors += 1
-            for i in range(chunk_size):
-                if adr + i < to_adr:
-                    yield None
+            _LOGGER.warning(f"registers[{adr}:{adr+count}] = modbus error or empty response")
+            for i in range(count):
+                yield None
         else:
-            for r in rr.registers:
+            for r in registers:
                 yield r
     _LOGGER.debug(f"registers: {to_adr-from_adr} | chunk:{chunk_size} |  ellapsed time: {(time.time() - starttime):.1f}s | errors: {errors}/{errors*chunk_size}")
 
@@ -13,25 +13,23 @@ from homeassistant.components.number import (
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import UnitOfTemperature
 from homeassistant.core import HomeAssistant, callback
-from homeassistant.helpers.entity import generate_entity_id
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from . import const, vnc
-from .coordinator import KitaCoordinator
-from .sensor import (
+from . import const
+from .const import (
     REG_ADDR_COOLING_SETPOINT,
     REG_ADDR_HEATING_SETPOINT,
     REG_ADDR_HOT_WATER_SETPOINT,
-    create_device_info,
-    get_2comp,
 )
+from .coordinator import KitaCoordinator
+from .modbus import get_2comp
+from .registers import create_device_info, entity_id
+from .setpoints import SetpointWriter
 
 _LOGGER = logging.getLogger(__name__)
 
-# Lock to serialise VNC operations (single-connection VNC server)
-_VNC_LOCK = asyncio.Lock()
-
 
 SETPOINT_ENTITIES = [
     {
@@ -70,15 +68,14 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up number entities for heat pump setpoint control."""
-    coordinator = hass.data[const.DOMAIN][config_entry.entry_id]["coordinator"]
-    hmi_host = config_entry.data.get(const.CONF_HMI_HOST, const.DEFAULT_HMI_HOST)
+    data = hass.data[const.DOMAIN][config_entry.entry_id]
 
     entities = [
         KitaSetpointNumber(
             hass=hass,
-            coordinator=coordinator,
+            coordinator=data["coordinator"],
             config_entry=config_entry,
-            hmi_host=hmi_host,
+            writer=data["setpoint_writer"],
             **desc,
         )
         for desc in SETPOINT_ENTITIES
@@ -95,7 +92,7 @@ class KitaSetpointNumber(CoordinatorEntity, NumberEntity):
         hass: HomeAssistant,
         coordinator: KitaCoordinator,
         config_entry: ConfigEntry,
-        hmi_host: str,
+        writer: SetpointWriter,
         key: str,
         name: str,
         vnc_key: str,
@@ -105,14 +102,13 @@ class KitaSetpointNumber(CoordinatorEntity, NumberEntity):
         icon: str,
     ) -> None:
         super().__init__(coordinator)
-        self._hmi_host = hmi_host
+        self._writer = writer
         self._vnc_key = vnc_key
         self._reg_addr = reg_addr
+        self._confirm_handle: asyncio.TimerHandle | None = None
 
         self._attr_unique_id = f"setpoint_{key}"
-        self.entity_id = generate_entity_id(
-            "number.{}", f"heat-pump-{name}", hass=hass
-        )
+        self.entity_id = entity_id("number", name)
         self._attr_device_info = create_device_info()
         self._attr_has_entity_name = False
         self._attr_name = name
@@ -171,21 +167,37 @@ class KitaSetpointNumber(CoordinatorEntity, NumberEntity):
             clicks,
         )
 
-        async with _VNC_LOCK:
-            try:
-                await vnc.adjust_setpoint(self._hmi_host, self._vnc_key, clicks)
-            except Exception:
-                _LOGGER.exception("Failed to set %s via VNC", self._vnc_key)
-                return
-
         # Optimistically update local state so the UI reflects the change
-        # immediately instead of waiting for the next coordinator poll.
+        # immediately instead of waiting for the next coordinator poll, and a
+        # further change joining the same session starts from the new value.
         self._attr_native_value = value
         self.async_write_ha_state()
 
-        # Schedule a coordinator refresh after the HMI writes to PLC (~30 s)
-        self.hass.loop.call_later(
-            35, lambda: self.hass.async_create_task(
-                self.coordinator.async_request_refresh()
-            )
-        )
+        try:
+            await self._writer.async_adjust(self._vnc_key, clicks)
+        except HomeAssistantError:
+            self._attr_native_value = current
+            self.async_write_ha_state()
+            raise
+        except Exception:
+            _LOGGER.exception("Failed to set %s via VNC", self._vnc_key)
+            self._attr_native_value = current
+            self.async_write_ha_state()
+            return
+
+        # Confirm the register once the HMI has written to the PLC (~30 s),
+        # ahead of any queued polls
+        if self._confirm_handle is not None:
+            self._confirm_handle.cancel()
+        self._confirm_handle = self.hass.loop.call_later(35, self._async_confirm)
+
+    @callback
+    def _async_confirm(self) -> None:
+        self._confirm_handle = None
+        self.hass.async_create_task(self.coordinator.async_confirm_register(self._reg_addr))
+
+    async def async_will_remove_from_hass(self) -> None:
+        if self._confirm_handle is not None:
+            self._confirm_handle.cancel()
+            self._confirm_handle = None
+        await super().async_will_remove_from_hass()
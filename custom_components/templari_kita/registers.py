@@ -0,0 +1,299 @@
+"""Register and entity tables, kept free of entity and I/O code.
+
+Everything here is built once at import; the setup path, services and the
+exporter read these tables without loading the sensor platform.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.const import (
+    UnitOfTemperature,
+    UnitOfVolumeFlowRate,
+    UnitOfPressure,
+    UnitOfPower,
+    REVOLUTIONS_PER_MINUTE,
+    PERCENTAGE,
+)
+from homeassistant.helpers.entity import DeviceInfo, EntityCategory
+from homeassistant.util import slugify
+
+from . import const
+from .const import (
+    REG_ADDR_BUFFER_TANK_TEMP,
+    REG_ADDR_HOT_WATER_TEMP,
+    REG_ADDR_HP_INLET_TEMP,
+    REG_ADDR_FLOW,
+    REG_ADDR_COMPRESSOR_HEAD_TEMP,
+    REG_ADDR_HP_OUTLET_TEMP,
+    REG_ADDR_EXTERNAL_TEMP,
+    REG_ADDR_DRAIN_TEMP,
+    REG_ADDR_SUCTION_TEMP,
+    REG_ADDR_HIGH_PRESSURE,
+    REG_ADDR_LOW_PRESSURE,
+    REG_ADDR_EVAPORATION,
+    REG_ADDR_CONDENSATION,
+    REG_ADDR_SH,
+    REG_ADDR_COMPRESSOR_SPEED,
+    REG_ADDR_COOLING_SETPOINT,
+    REG_ADDR_HEATING_SETPOINT,
+    REG_ADDR_HOT_WATER_SETPOINT,
+    REG_ADDR_HEATING_COOLING_SETPOINT,
+    REG_ADDR_EEV,
+    REG_ADDR_INJ,
+    REG_ADDR_TJ,
+    REG_ADDR_ENERGY_CONSUMPTION,
+    REG_ADDR_MODE,
+)
+
+REG_RANGES = [
+    (REG_ADDR_BUFFER_TANK_TEMP,REG_ADDR_COMPRESSOR_SPEED),
+    (REG_ADDR_COOLING_SETPOINT,REG_ADDR_TJ),
+    (REG_ADDR_ENERGY_CONSUMPTION,REG_ADDR_ENERGY_CONSUMPTION),
+    (REG_ADDR_MODE,REG_ADDR_MODE),
+]
+
+# Registers sampled at FAST_POLL_INTERVAL to catch short spikes between polls
+FAST_REG_RANGES = [
+    (REG_ADDR_BUFFER_TANK_TEMP,REG_ADDR_COMPRESSOR_SPEED),
+    (REG_ADDR_ENERGY_CONSUMPTION,REG_ADDR_ENERGY_CONSUMPTION),
+]
+
+
+@dataclass
+class KitaSensorEntityDescription(SensorEntityDescription):
+    multiplier: float | None = None
+
+
+SENSOR_TYPES = [
+    KitaSensorEntityDescription(
+        key=REG_ADDR_BUFFER_TANK_TEMP,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        name="Heating/cooling buffer tank temperature",
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        multiplier=0.1,
+    ),
+    KitaSensorEntityDescription(
+        key=REG_ADDR_HOT_WATER_TEMP,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        name="Hot water temperature",
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        multiplier=0.1,
+    ),
+    KitaSensorEntityDescription(
+        key=REG_ADDR_HP_INLET_TEMP,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        name="Heat pump inlet temperature",
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        multiplier=0.1,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    KitaSensorEntityDescription(
+        key=REG_ADDR_FLOW,
+        device_class=SensorDeviceClass.VOLUME_FLOW_RATE,
+        state_class=SensorStateClass.MEASUREMENT,
+        name="Flow",
+        native_unit_of_measurement=UnitOfVolumeFlowRate.LITERS_PER_MINUTE,
+        multiplier=0.1,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        icon="mdi:pipe",
+    ),
+    KitaSensorEntityDescription(
+        key=REG_ADDR_COMPRESSOR_HEAD_TEMP,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        name="Compressor head temperature",
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        multiplier=0.1,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    KitaSensorEntityDescription(
+        key=REG_ADDR_HP_OUTLET_TEMP,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        name="Heat pump outlet temperature",
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        multiplier=0.1,
+    ),
+    KitaSensorEntityDescription(
+        key=REG_ADDR_EXTERNAL_TEMP,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        name="External temperature",
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        multiplier=0.1,
+    ),
+    KitaSensorEntityDescription(
+        key=REG_ADDR_DRAIN_TEMP,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        name="Drain temperature",
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        multiplier=0.1,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    KitaSensorEntityDescription(
+        key=REG_ADDR_SUCTION_TEMP,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        name="Suction temperature",
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        multiplier=0.1,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    KitaSensorEntityDescription(
+        key=REG_ADDR_HIGH_PRESSURE,
+        device_class=SensorDeviceClass.PRESSURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        name="High pressure",
+        native_unit_of_measurement=UnitOfPressure.BAR,
+        multiplier=0.1,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    KitaSensorEntityDescription(
+        key=REG_ADDR_LOW_PRESSURE,
+        device_class=SensorDeviceClass.PRESSURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        name="Low pressure",
+        native_unit_of_measurement=UnitOfPressure.BAR,
+        multiplier=0.1,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    KitaSensorEntityDescription(
+        key=REG_ADDR_EVAPORATION,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        name="Evaporation",
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        multiplier=0.1,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    KitaSensorEntityDescription(
+        key=REG_ADDR_CONDENSATION,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        name="Condensation",
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        multiplier=0.1,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    KitaSensorEntityDescription(
+        key=REG_ADDR_SH,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        name="SH",
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        multiplier=0.1,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    KitaSensorEntityDescription(
+        key=REG_ADDR_COMPRESSOR_SPEED,
+        state_class=SensorStateClass.MEASUREMENT,
+        name="Compressor speed",
+        native_unit_of_measurement=REVOLUTIONS_PER_MINUTE,
+        multiplier=6,  # RPS * 10
+        icon="mdi:fan",
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    KitaSensorEntityDescription(
+        key=REG_ADDR_COOLING_SETPOINT,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        name="Cooling setpoint",
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        multiplier=0.1,
+    ),
+    KitaSensorEntityDescription(
+        key=REG_ADDR_HEATING_SETPOINT,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        name="Heating setpoint",
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        multiplier=0.1,
+    ),
+    KitaSensorEntityDescription(
+        key=REG_ADDR_HEATING_COOLING_SETPOINT,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        name="Heating/cooling setpoint",
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        multiplier=0.1,
+    ),
+    KitaSensorEntityDescription(
+        key=REG_ADDR_HOT_WATER_SETPOINT,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        name="Hot water setpoint",
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        multiplier=0.1,
+    ),
+    KitaSensorEntityDescription(
+        key=REG_ADDR_EEV,
+        state_class=SensorStateClass.MEASUREMENT,
+        name="EEV",
+        native_unit_of_measurement=PERCENTAGE,
+        multiplier=0.1,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    KitaSensorEntityDescription(
+        key=REG_ADDR_INJ,
+        state_class=SensorStateClass.MEASUREMENT,
+        name="Injection",
+        native_unit_of_measurement=PERCENTAGE,
+        multiplier=0.1,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    KitaSensorEntityDescription(
+        key=REG_ADDR_TJ,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        name="TJ",
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        multiplier=0.1,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    KitaSensorEntityDescription(
+        key=REG_ADDR_ENERGY_CONSUMPTION,
+        device_class=SensorDeviceClass.POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+        name="Energy consumption",
+        native_unit_of_measurement=UnitOfPower.WATT,
+    ),
+    KitaSensorEntityDescription(
+        key=REG_ADDR_MODE,
+        name="Mode",
+        device_class=SensorDeviceClass.ENUM,
+    )
+]
+
+# Register address -> decode multiplier (None when the raw value is used as is)
+MULTIPLIERS = {descr.key: descr.multiplier for descr in SENSOR_TYPES}
+
+DEVICE_INFO = DeviceInfo(
+    identifiers={(const.DOMAIN, "heat-pump")},
+    name="Heat pump",
+    manufacturer=const.MANUFACTURER,
+    model=const.MODEL,
+)
+
+
+def create_device_info() -> DeviceInfo:
+    return DEVICE_INFO
+
+
+def entity_id(domain: str, name: str) -> str:
+    """Entity id for a device entity.
+
+    Same id generate_entity_id would pick, without scanning the state machine
+    for collisions; the entity registry keeps ids stable after the first setup.
+    """
+    return f"{domain}.{slugify(f'heat-pump-{name}')}"
@@ -0,0 +1,140 @@
+"""High-resolution per-register sample rings."""
+
+from __future__ import annotations
+
+import time
+from array import array
+from typing import NamedTuple
+
+from .modbus import get_2comp
+
+
+class SampleStats(NamedTuple):
+    """Decoded (signed, unscaled) statistics since the previous publish."""
+    min: int
+    max: int
+    mean: float
+    count: int
+
+    def merged(self, other: "SampleStats | None") -> "SampleStats":
+        """Stats covering both intervals."""
+        if other is None:
+            return self
+        count = self.count + other.count
+        return SampleStats(
+            min(self.min, other.min),
+            max(self.max, other.max),
+            (self.mean * self.count + other.mean * other.count) / count,
+            count,
+        )
+
+
+class SampleRing:
+    """Fixed-capacity ring of (timestamp, raw value) samples for one register.
+
+    A failed read is stored as a gap, so consumers can tell a missing sample
+    from a steady value. Also keeps running min/max/sum since the last publish so summarising a
+    publish interval is O(1) no matter how many samples it spans.
+    """
+
+    __slots__ = ("_times", "_values", "_valid", "_next", "_size", "_min", "_max", "_sum", "_count")
+
+    def __init__(self, capacity: int) -> None:
+        self._times = array("d", bytes(8 * capacity))
+        self._values = array("H", bytes(2 * capacity))
+        self._valid = bytearray(capacity)
+        self._next = 0
+        self._size = 0
+        self._reset_stats()
+
+    def _reset_stats(self) -> None:
+        self._min = None
+        self._max = None
+        self._sum = 0
+        self._count = 0
+
+    def add(self, timestamp: float, raw: int) -> None:
+        capacity = len(self._values)
+        self._times[self._next] = timestamp
+        self._values[self._next] = raw
+        self._valid[self._next] = 1
+        self._next = (self._next + 1) % capacity
+        self._size = min(self._size + 1, capacity)
+
+        value = get_2comp(raw)
+        if self._count == 0 or value < self._min:
+            self._min = value
+        if self._count == 0 or value > self._max:
+            self._max = value
+        self._sum += value
+        self._count += 1
+
+    def add_gap(self, timestamp: float) -> None:
+        capacity = len(self._values)
+        self._times[self._next] = timestamp
+        self._valid[self._next] = 0
+        self._next = (self._next + 1) % capacity
+        self._size = min(self._size + 1, capacity)
+
+    def publish(self) -> SampleStats | None:
+        """Return stats since the previous publish and start a new interval."""
+        if self._count == 0:
+            return None
+        stats = SampleStats(self._min, self._max, self._sum / self._count, self._count)
+        self._reset_stats()
+        return stats
+
+    def samples(self) -> list[tuple[float, int | None]]:
+        """Oldest-first (monotonic timestamp, decoded value) pairs; gaps have no value."""
+        capacity = len(self._values)
+        start = (self._next - self._size) % capacity
+        return [
+            (
+                self._times[i % capacity],
+                get_2comp(self._values[i % capacity]) if self._valid[i % capacity] else None,
+            )
+            for i in range(start, start + self._size)
+        ]
+
+
+class RegisterSampler:
+    """One SampleRing per register, fed at the raw poll rate."""
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.rings: dict[int, SampleRing] = {}
+        self.stats: dict[int, SampleStats] = {}
+
+    def _ring(self, addr: int) -> SampleRing:
+        if (ring := self.rings.get(addr)) is None:
+            ring = self.rings[addr] = SampleRing(self.capacity)
+        return ring
+
+    def add(self, timestamp: float, from_addr: int, regs: list[int] | None) -> None:
+        if regs is None:
+            return
+        for i, reg in enumerate(regs):
+            self._ring(from_addr + i).add(timestamp, reg)
+
+    def add_gap(self, timestamp: float, from_addr: int, count: int) -> None:
+        """Record a failed read of ``count`` registers."""
+        for addr in range(from_addr, from_addr + count):
+            self._ring(addr).add_gap(timestamp)
+
+    def publish(self) -> None:
+        """Summarise every register's samples since the previous publish."""
+        self.stats = {}
+        for addr, ring in self.rings.items():
+            if (stats := ring.publish()) is not None:
+                self.stats[addr] = stats
+
+    def dump(self, addresses: list[int] | None = None) -> dict[int, list[tuple[float, int | None]]]:
+        """Buffered samples with wall-clock (epoch) timestamps."""
+        offset = time.time() - time.monotonic()
+        if addresses is None:
+            addresses = sorted(self.rings)
+        return {
+            addr: [(t + offset, value) for t, value in self.rings[addr].samples()]
+            for addr in addresses
+            if addr in self.rings
+        }
@@ -1,12 +1,15 @@
 from __future__ import annotations
 
 import logging
+import time
 from dataclasses import dataclass
 from datetime import timedelta
+from typing import Callable
 
 from homeassistant.helpers.update_coordinator import CoordinatorEntity, DataUpdateCoordinator
 from .coordinator import KitaCoordinator
 from . import modbus
+from .modbus import get_2comp
 
 from homeassistant.core import callback
 
@@ -19,270 +22,262 @@ from homeassistant.components.sensor import (
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (
     UnitOfTemperature,
-    UnitOfVolumeFlowRate,
-    UnitOfPressure,
     UnitOfPower,
-    REVOLUTIONS_PER_MINUTE,
-    PERCENTAGE,
+    UnitOfEnergy,
+    UnitOfTime,
 )
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.entity import DeviceInfo, EntityCategory, generate_entity_id
+from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.util import slugify
 from pymodbus.client import AsyncModbusTcpClient
 from . import const
+from .energy import (
+    ENERGY_GROUP_HEATING_COOLING,
+    ENERGY_GROUP_HOT_WATER,
+    ENERGY_GROUP_OTHER,
+)
+from .metrics import WINDOW_1_H, WINDOW_24_H, WINDOW_5_MIN
+from .samples import SampleStats
+from .registers import SENSOR_TYPES, KitaSensorEntityDescription, create_device_info, entity_id
+
+from .const import (
+    REG_ADDR_HP_INLET_TEMP,
+    REG_ADDR_HP_OUTLET_TEMP,
+    REG_ADDR_MODE,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
-REG_ADDR_BUFFER_TANK_TEMP = 2
-REG_ADDR_HOT_WATER_TEMP = 3
-REG_ADDR_HP_INLET_TEMP = 4
-REG_ADDR_FLOW = 5
-REG_ADDR_COMPRESSOR_HEAD_TEMP = 6
-REG_ADDR_HP_OUTLET_TEMP = 7
-REG_ADDR_EXTERNAL_TEMP = 8
-REG_ADDR_DRAIN_TEMP = 9
-REG_ADDR_SUCTION_TEMP = 10
-REG_ADDR_HIGH_PRESSURE = 11
-REG_ADDR_LOW_PRESSURE = 12
-REG_ADDR_EVAPORATION = 13
-REG_ADDR_CONDENSATION = 14
-REG_ADDR_SH = 15
-REG_ADDR_COMPRESSOR_SPEED = 18
-REG_ADDR_COOLING_SETPOINT = 65
-REG_ADDR_HEATING_SETPOINT = 66
-REG_ADDR_HOT_WATER_SETPOINT = 67
-REG_ADDR_HEATING_COOLING_SETPOINT = 68
-REG_ADDR_EEV = 70
-REG_ADDR_INJ = 72
-REG_ADDR_TJ = 73
-REG_ADDR_ENERGY_CONSUMPTION = 234
-REG_ADDR_MODE = 1081
-
-REG_RANGES = [
-    (REG_ADDR_BUFFER_TANK_TEMP,REG_ADDR_COMPRESSOR_SPEED),
-    (REG_ADDR_COOLING_SETPOINT,REG_ADDR_TJ),
-    (REG_ADDR_ENERGY_CONSUMPTION,REG_ADDR_ENERGY_CONSUMPTION),
-    (REG_ADDR_MODE,REG_ADDR_MODE),
-]
 
 @dataclass
-class KitaSensorEntityDescription(SensorEntityDescription):
-    multiplier: float | None = None
+class KitaDerivedSensorEntityDescription(SensorEntityDescription):
+    """Sensor computed by the coordinator rather than read from a register."""
+    value_fn: Callable[[KitaCoordinator], float | None] | None = None
+    attrs_fn: Callable[[KitaCoordinator], dict] | None = None
+    # Counter that restarts from zero at midnight
+    resets_daily: bool = False
 
 
-SENSOR_TYPES = [
-    KitaSensorEntityDescription(
-        key=REG_ADDR_BUFFER_TANK_TEMP,
-        device_class=SensorDeviceClass.TEMPERATURE,
-        state_class=SensorStateClass.MEASUREMENT,
-        name="Heating/cooling buffer tank temperature",
-        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
-        multiplier=0.1,
+DERIVED_SENSOR_TYPES = [
+    KitaDerivedSensorEntityDescription(
+        key="energy-total",
+        device_class=SensorDeviceClass.ENERGY,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        name="Energy total",
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        suggested_display_precision=2,
+        value_fn=lambda c: c.energy.total_kwh,
     ),
-    KitaSensorEntityDescription(
-        key=REG_ADDR_HOT_WATER_TEMP,
-        device_class=SensorDeviceClass.TEMPERATURE,
-        state_class=SensorStateClass.MEASUREMENT,
-        name="Hot water temperature",
-        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
-        multiplier=0.1,
+    KitaDerivedSensorEntityDescription(
+        key="energy-today-hc",
+        device_class=SensorDeviceClass.ENERGY,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        name="Energy today (heating/cooling)",
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        suggested_display_precision=2,
+        resets_daily=True,
+        value_fn=lambda c: c.energy.daily_kwh[ENERGY_GROUP_HEATING_COOLING],
     ),
-    KitaSensorEntityDescription(
-        key=REG_ADDR_HP_INLET_TEMP,
-        device_class=SensorDeviceClass.TEMPERATURE,
-        state_class=SensorStateClass.MEASUREMENT,
-        name="Heat pump inlet temperature",
-        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
-        multiplier=0.1,
-        entity_category=EntityCategory.DIAGNOSTIC,
+    KitaDerivedSensorEntityDescription(
+        key="energy-today-dhw",
+        device_class=SensorDeviceClass.ENERGY,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        name="Energy today (hot water)",
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        suggested_display_precision=2,
+        resets_daily=True,
+        value_fn=lambda c: c.energy.daily_kwh[ENERGY_GROUP_HOT_WATER],
     ),
-    KitaSensorEntityDescription(
-        key=REG_ADDR_FLOW,
-        device_class=SensorDeviceClass.VOLUME_FLOW_RATE,
-        state_class=SensorStateClass.MEASUREMENT,
-        name="Flow",
-        native_unit_of_measurement=UnitOfVolumeFlowRate.LITERS_PER_MINUTE,
-        multiplier=0.1,
+    KitaDerivedSensorEntityDescription(
+        key="energy-today-other",
+        device_class=SensorDeviceClass.ENERGY,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        name="Energy today (other)",
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        suggested_display_precision=2,
         entity_category=EntityCategory.DIAGNOSTIC,
-        icon="mdi:pipe",
+        resets_daily=True,
+        value_fn=lambda c: c.energy.daily_kwh[ENERGY_GROUP_OTHER],
     ),
-    KitaSensorEntityDescription(
-        key=REG_ADDR_COMPRESSOR_HEAD_TEMP,
-        device_class=SensorDeviceClass.TEMPERATURE,
+    KitaDerivedSensorEntityDescription(
+        key="thermal-power",
+        device_class=SensorDeviceClass.POWER,
         state_class=SensorStateClass.MEASUREMENT,
-        name="Compressor head temperature",
-        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
-        multiplier=0.1,
-        entity_category=EntityCategory.DIAGNOSTIC,
+        name="Thermal power",
+        native_unit_of_measurement=UnitOfPower.KILO_WATT,
+        suggested_display_precision=2,
+        value_fn=lambda c: c.metrics.thermal_kw,
     ),
-    KitaSensorEntityDescription(
-        key=REG_ADDR_HP_OUTLET_TEMP,
-        device_class=SensorDeviceClass.TEMPERATURE,
+    KitaDerivedSensorEntityDescription(
+        key="cop",
         state_class=SensorStateClass.MEASUREMENT,
-        name="Heat pump outlet temperature",
-        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
-        multiplier=0.1,
+        name="COP",
+        suggested_display_precision=2,
+        icon="mdi:heat-pump",
+        value_fn=lambda c: c.metrics.cop,
     ),
-    KitaSensorEntityDescription(
-        key=REG_ADDR_EXTERNAL_TEMP,
-        device_class=SensorDeviceClass.TEMPERATURE,
+    KitaDerivedSensorEntityDescription(
+        key="scop",
         state_class=SensorStateClass.MEASUREMENT,
-        name="External temperature",
-        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
-        multiplier=0.1,
+        name="SCOP",
+        suggested_display_precision=2,
+        icon="mdi:heat-pump",
+        value_fn=lambda c: c.metrics.scop,
     ),
-    KitaSensorEntityDescription(
-        key=REG_ADDR_DRAIN_TEMP,
-        device_class=SensorDeviceClass.TEMPERATURE,
+    KitaDerivedSensorEntityDescription(
+        key="condensing-approach",
         state_class=SensorStateClass.MEASUREMENT,
-        name="Drain temperature",
-        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
-        multiplier=0.1,
+        name="Condensing approach",
+        native_unit_of_measurement=UnitOfTemperature.KELVIN,
+        suggested_display_precision=1,
         entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda c: c.metrics.condensing_approach,
     ),
-    KitaSensorEntityDescription(
-        key=REG_ADDR_SUCTION_TEMP,
-        device_class=SensorDeviceClass.TEMPERATURE,
+    KitaDerivedSensorEntityDescription(
+        key="evaporating-approach",
         state_class=SensorStateClass.MEASUREMENT,
-        name="Suction temperature",
-        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
-        multiplier=0.1,
+        name="Evaporating approach",
+        native_unit_of_measurement=UnitOfTemperature.KELVIN,
+        suggested_display_precision=1,
         entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda c: c.metrics.evaporating_approach,
     ),
-    KitaSensorEntityDescription(
-        key=REG_ADDR_HIGH_PRESSURE,
-        device_class=SensorDeviceClass.PRESSURE,
+] + [
+    KitaDerivedSensorEntityDescription(
+        key=f"thermal-power-{window}",
+        device_class=SensorDeviceClass.POWER,
         state_class=SensorStateClass.MEASUREMENT,
-        name="High pressure",
-        native_unit_of_measurement=UnitOfPressure.BAR,
-        multiplier=0.1,
-        entity_category=EntityCategory.DIAGNOSTIC,
-    ),
-    KitaSensorEntityDescription(
-        key=REG_ADDR_LOW_PRESSURE,
-        device_class=SensorDeviceClass.PRESSURE,
+        name=f"Thermal power ({label} average)",
+        native_unit_of_measurement=UnitOfPower.KILO_WATT,
+        suggested_display_precision=2,
+        value_fn=lambda c, window=window: c.metrics.average("thermal_kw", window),
+    )
+    for window, label in ((WINDOW_5_MIN, "5 min"), (WINDOW_1_H, "1 h"), (WINDOW_24_H, "24 h"))
+] + [
+    KitaDerivedSensorEntityDescription(
+        key=f"cop-{window}",
         state_class=SensorStateClass.MEASUREMENT,
-        name="Low pressure",
-        native_unit_of_measurement=UnitOfPressure.BAR,
-        multiplier=0.1,
+        name=f"COP ({label} average)",
+        suggested_display_precision=2,
+        icon="mdi:heat-pump",
+        value_fn=lambda c, window=window: c.metrics.average("cop", window),
+    )
+    for window, label in ((WINDOW_5_MIN, "5 min"), (WINDOW_1_H, "1 h"), (WINDOW_24_H, "24 h"))
+] + [
+    KitaDerivedSensorEntityDescription(
+        key="compressor-starts",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        name="Compressor starts",
+        icon="mdi:counter",
         entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda c: c.cycles.starts_total,
     ),
-    KitaSensorEntityDescription(
-        key=REG_ADDR_EVAPORATION,
-        device_class=SensorDeviceClass.TEMPERATURE,
-        state_class=SensorStateClass.MEASUREMENT,
-        name="Evaporation",
-        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
-        multiplier=0.1,
+    KitaDerivedSensorEntityDescription(
+        key="compressor-starts-today",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        name="Compressor starts today",
+        icon="mdi:counter",
         entity_category=EntityCategory.DIAGNOSTIC,
+        resets_daily=True,
+        value_fn=lambda c: c.cycles.today["starts"],
+        attrs_fn=lambda c: c.cycles.histogram_attributes(),
     ),
-    KitaSensorEntityDescription(
-        key=REG_ADDR_CONDENSATION,
-        device_class=SensorDeviceClass.TEMPERATURE,
-        state_class=SensorStateClass.MEASUREMENT,
-        name="Condensation",
-        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
-        multiplier=0.1,
+    KitaDerivedSensorEntityDescription(
+        key="compressor-short-cycles-today",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        name="Compressor short cycles today",
+        icon="mdi:counter",
         entity_category=EntityCategory.DIAGNOSTIC,
+        resets_daily=True,
+        value_fn=lambda c: c.cycles.today["short_cycles"],
     ),
-    KitaSensorEntityDescription(
-        key=REG_ADDR_SH,
-        device_class=SensorDeviceClass.TEMPERATURE,
-        state_class=SensorStateClass.MEASUREMENT,
-        name="SH",
-        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
-        multiplier=0.1,
+    KitaDerivedSensorEntityDescription(
+        key="compressor-runtime-today",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        name="Compressor run time today",
+        native_unit_of_measurement=UnitOfTime.HOURS,
+        suggested_display_precision=2,
         entity_category=EntityCategory.DIAGNOSTIC,
+        resets_daily=True,
+        value_fn=lambda c: c.cycles.today["runtime"] / 3600,
     ),
-    KitaSensorEntityDescription(
-        key=REG_ADDR_COMPRESSOR_SPEED,
+    KitaDerivedSensorEntityDescription(
+        key="compressor-last-cycle",
+        device_class=SensorDeviceClass.DURATION,
         state_class=SensorStateClass.MEASUREMENT,
-        name="Compressor speed",
-        native_unit_of_measurement=REVOLUTIONS_PER_MINUTE,
-        multiplier=6,  # RPS * 10
-        icon="mdi:fan",
+        name="Compressor last cycle duration",
+        native_unit_of_measurement=UnitOfTime.MINUTES,
+        suggested_display_precision=1,
         entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda c: None if c.cycles.last_cycle_duration is None else c.cycles.last_cycle_duration / 60,
     ),
-    KitaSensorEntityDescription(
-        key=REG_ADDR_COOLING_SETPOINT,
-        device_class=SensorDeviceClass.TEMPERATURE,
-        state_class=SensorStateClass.MEASUREMENT,
-        name="Cooling setpoint",
-        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
-        multiplier=0.1,
-    ),
-    KitaSensorEntityDescription(
-        key=REG_ADDR_HEATING_SETPOINT,
-        device_class=SensorDeviceClass.TEMPERATURE,
-        state_class=SensorStateClass.MEASUREMENT,
-        name="Heating setpoint",
-        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
-        multiplier=0.1,
-    ),
-    KitaSensorEntityDescription(
-        key=REG_ADDR_HEATING_COOLING_SETPOINT,
-        device_class=SensorDeviceClass.TEMPERATURE,
-        state_class=SensorStateClass.MEASUREMENT,
-        name="Heating/cooling setpoint",
-        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
-        multiplier=0.1,
-    ),
-    KitaSensorEntityDescription(
-        key=REG_ADDR_HOT_WATER_SETPOINT,
-        device_class=SensorDeviceClass.TEMPERATURE,
-        state_class=SensorStateClass.MEASUREMENT,
-        name="Hot water setpoint",
-        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
-        multiplier=0.1,
-    ),
-    KitaSensorEntityDescription(
-        key=REG_ADDR_EEV,
-        state_class=SensorStateClass.MEASUREMENT,
-        name="EEV",
-        native_unit_of_measurement=PERCENTAGE,
-        multiplier=0.1,
+    KitaDerivedSensorEntityDescription(
+        key="defrosts-today",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        name="Defrosts today",
+        icon="mdi:snowflake-melt",
         entity_category=EntityCategory.DIAGNOSTIC,
+        resets_daily=True,
+        value_fn=lambda c: c.cycles.today["defrosts"],
     ),
-    KitaSensorEntityDescription(
-        key=REG_ADDR_INJ,
+    KitaDerivedSensorEntityDescription(
+        key="modbus-queue-depth",
         state_class=SensorStateClass.MEASUREMENT,
-        name="Injection",
-        native_unit_of_measurement=PERCENTAGE,
-        multiplier=0.1,
+        name="Modbus queue depth",
+        icon="mdi:tray-full",
         entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda c: c.request_queue.depth,
+        attrs_fn=lambda c: c.request_queue.metrics(),
     ),
-    KitaSensorEntityDescription(
-        key=REG_ADDR_TJ,
+]
+
+# Added when the weather compensation controller is enabled
+CURVE_SENSOR_TYPES = [
+    KitaDerivedSensorEntityDescription(
+        key="heating-curve-target",
         device_class=SensorDeviceClass.TEMPERATURE,
         state_class=SensorStateClass.MEASUREMENT,
-        name="TJ",
+        name="Heating curve target",
         native_unit_of_measurement=UnitOfTemperature.CELSIUS,
-        multiplier=0.1,
-        entity_category=EntityCategory.DIAGNOSTIC,
+        icon="mdi:chart-bell-curve-cumulative",
+        value_fn=lambda c: c.curve.target,
+        attrs_fn=lambda c: c.curve.attributes(),
     ),
-    KitaSensorEntityDescription(
-        key=REG_ADDR_ENERGY_CONSUMPTION,
-        device_class=SensorDeviceClass.POWER,
-        state_class=SensorStateClass.MEASUREMENT,
-        name="Energy consumption",
-        native_unit_of_measurement=UnitOfPower.WATT,
+    KitaDerivedSensorEntityDescription(
+        key="setpoint-sessions-avoided",
+        name="Setpoint sessions avoided",
+        icon="mdi:counter",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda c: c.curve.avoided_sessions,
+        attrs_fn=lambda c: {
+            "naive_writes": c.curve.naive_writes,
+            "sessions": c.curve.sessions,
+            "vnc_requests": c.curve.writer.requests,
+            "vnc_sessions": c.curve.writer.sessions,
+        },
     ),
-    KitaSensorEntityDescription(
-        key=REG_ADDR_MODE,
-        name="Mode",
-        device_class=SensorDeviceClass.ENUM,
-    )
 ]
 
+# Smallest change worth a state write in statistics mode, per device class
+STATISTICS_DEADBANDS = {
+    SensorDeviceClass.TEMPERATURE: 0.5,
+    SensorDeviceClass.PRESSURE: 0.2,
+    SensorDeviceClass.VOLUME_FLOW_RATE: 1.0,
+    SensorDeviceClass.POWER: 50,
+    SensorDeviceClass.ENERGY: 0.1,
+}
+DEFAULT_STATISTICS_DEADBAND = 1.0
 
-# for i in [1, 31, 32, 33, 41, 42, 56, 69, 71] + list(range(74, 234)) + list(range(235, 1280)):
-#     REG_ADDR_TYPES.append(
-#         KitaSensorEntityDescription(
-#             key=i,
-#             name=f"R{i}",
-#             state_class=SensorStateClass.MEASUREMENT,
-#         )
-#     )
+
+# Explorer mode: one disabled-by-default entity per register without a sensor
+EXPLORER_DESCRIPTION = SensorEntityDescription(
+    key="explorer",
+    state_class=SensorStateClass.MEASUREMENT,
+    entity_category=EntityCategory.DIAGNOSTIC,
+    entity_registry_enabled_default=False,
+)
 
 async def async_setup_entry(
         hass: HomeAssistant,
@@ -294,6 +289,9 @@ async def async_setup_entry(
     sensors = [
         KitaSensor(hass=hass, coordinator=coordinator, config_entry=config_entry, description=description)
         for description in SENSOR_TYPES
+    ] + [
+        KitaDerivedSensor(hass=hass, coordinator=coordinator, config_entry=config_entry, description=description)
+        for description in DERIVED_SENSOR_TYPES
     ] + [
         KitaActiveSensor(
             hass=hass,
@@ -333,25 +331,113 @@ async def async_setup_entry(
         ),
     ]
 
+    if coordinator.curve is not None:
+        sensors += [
+            KitaDerivedSensor(hass=hass, coordinator=coordinator, config_entry=config_entry, description=description)
+            for description in CURVE_SENSOR_TYPES
+        ]
+
+    if config_entry.options.get(const.CONF_EXPLORER_MODE, False):
+        known = {descr.key for descr in SENSOR_TYPES}
+        sensors += [
+            KitaExplorerSensor(coordinator, addr)
+            for addr in range(const.EXPLORER_END_ADDR)
+            if addr not in known
+        ]
+
+    if coordinator.statistics is not None:
+        register_statistics(coordinator)
+
     async_add_entities(sensors, True)
 
 
-def create_device_info():
-    return DeviceInfo(
-        identifiers={(const.DOMAIN, "heat-pump")},
-        name=f"Heat pump",
-        manufacturer=const.MANUFACTURER,
-        model=const.MODEL,
-    )
+def register_statistics(coordinator: KitaCoordinator) -> None:
+    """Feed register and derived measurements to the hourly statistics import."""
+    statistics = coordinator.statistics
+    for descr in SENSOR_TYPES:
+        if descr.state_class == SensorStateClass.MEASUREMENT:
+            statistics.register(
+                slugify(descr.name),
+                descr.name,
+                descr.native_unit_of_measurement,
+                lambda data, descr=descr: decode_value(descr, data.get(descr.key)),
+                range_fn=lambda descr=descr: _sample_range(coordinator, descr),
+            )
+    for descr in DERIVED_SENSOR_TYPES:
+        # Daily counters keep their state class; the recorder's own statistics handle the reset
+        if descr.state_class is not None and not descr.resets_daily:
+            statistics.register(
+                descr.key,
+                descr.name,
+                descr.native_unit_of_measurement,
+                lambda data, descr=descr: descr.value_fn(coordinator),
+                has_sum=descr.state_class != SensorStateClass.MEASUREMENT,
+            )
+
 
+def _sample_range(coordinator: KitaCoordinator, descr: KitaSensorEntityDescription) -> tuple[float, float] | None:
+    """Min/max of the samples taken since the previous poll, fast tier included."""
+    stats = coordinator.sampler.stats.get(descr.key)
+    if stats is None:
+        return None
+    multiplier = descr.multiplier or 1
+    return stats.min * multiplier, stats.max * multiplier
 
-def get_2comp(value):
-    return value - 2 ** 16 if value & 2 ** 15 else value
 
+def decode_value(descr: KitaSensorEntityDescription, raw: int | None) -> float | None:
+    if raw is None:
+        return None
+    value = get_2comp(raw)  # handle negative values
+    if descr.multiplier is not None:
+        value *= descr.multiplier
+    return value
 
-class KitaSensor(CoordinatorEntity, SensorEntity):
+
+class KitaPublishMixin:
+    """Writes every state, or in statistics mode only significant changes."""
+
+    _last_published_value: float | None = None
+    _last_published_at: float = 0.0
+
+    def _init_publish(self, description: SensorEntityDescription) -> None:
+        self._deadband = STATISTICS_DEADBANDS.get(description.device_class, DEFAULT_STATISTICS_DEADBAND)
+        if self.coordinator.statistics is None:
+            return
+        if getattr(description, "resets_daily", False):
+            # The recorder needs the last value before each reset, so every poll is written
+            self._deadband = 0
+        else:
+            # Long-term statistics come from the coordinator's import instead
+            self._attr_state_class = None
+
+    def _async_publish(self) -> bool:
+        """Write the state unless statistics mode suppresses it; returns whether it was written."""
+        value = self._attr_native_value
+        if self.coordinator.statistics is not None:
+            now = time.monotonic()
+            last = self._last_published_value
+            if (
+                    isinstance(value, (int, float)) and isinstance(last, (int, float))
+                    and abs(value - last) < self._deadband
+                    and now - self._last_published_at < const.STATISTICS_PUBLISH_INTERVAL
+            ):
+                return False
+            self._last_published_at = now
+        self._last_published_value = value
+        self.async_write_ha_state()
+        return True
+
+
+class KitaSensor(KitaPublishMixin, CoordinatorEntity, SensorEntity):
     entity_description: KitaSensorEntityDescription
 
+    # Changes with every poll; recording it would defeat attribute deduplication
+    _unrecorded_attributes = frozenset({"sample_time"})
+
+    # Sample stats accumulated since the last written state
+    _window_stats: SampleStats | None = None
+    _merged_stats: SampleStats | None = None
+
     def __init__(
             self,
             hass: HomeAssistant,
@@ -362,25 +448,52 @@ class KitaSensor(CoordinatorEntity, SensorEntity):
         super().__init__(coordinator)
         self.entity_description = description
         self._attr_unique_id = f"{description.key}"
-        self.entity_id = generate_entity_id("sensor.{}", f"heat-pump-{description.name}", hass=hass)
+        self.entity_id = entity_id("sensor", description.name)
         self._attr_device_info = create_device_info()
+        self._init_publish(description)
 
     @callback
     def _handle_coordinator_update(self) -> None:
         descr = self.entity_description
-        value = self.coordinator.data[descr.key]
+        stats = self.coordinator.sampler.stats.get(descr.key)
+        # Polls whose state write is suppressed still count towards min/max/mean;
+        # updates without a new poll (register confirmations) bring no new stats
+        if stats is not None and stats is not self._merged_stats:
+            self._merged_stats = stats
+            self._window_stats = stats.merged(self._window_stats)
+        value = decode_value(descr, self.coordinator.data[descr.key])
         if value is None:
             self._attr_available = False
             return
         self._attr_available = True
-        value = get_2comp(value)  # handle negative values
-        if descr.multiplier is not None:
-            value *= descr.multiplier
         self._attr_native_value = value
-        self.async_write_ha_state()
+        self._attr_extra_state_attributes = self._sample_attributes()
+        if self._async_publish():
+            self._window_stats = None
 
+    def _sample_attributes(self) -> dict:
+        """When the value was read, and min/max/mean of the samples since the previous publish.
 
-class KitaActiveSensor(CoordinatorEntity, SensorEntity):
+        HA stamps states with the time they are written, so the actual
+        Modbus read time travels as an attribute.
+        """
+        descr = self.entity_description
+        attrs = {}
+        if (read := self.coordinator.data.read_of(descr.key)) is not None:
+            attrs["sample_time"] = read.utc.isoformat()
+        if descr.device_class == SensorDeviceClass.ENUM:
+            return attrs
+        stats = self._window_stats
+        if stats is not None:
+            multiplier = descr.multiplier or 1
+            attrs["min"] = round(stats.min * multiplier, 2)
+            attrs["max"] = round(stats.max * multiplier, 2)
+            attrs["mean"] = round(stats.mean * multiplier, 2)
+            attrs["samples"] = stats.count
+        return attrs
+
+
+class KitaActiveSensor(KitaPublishMixin, CoordinatorEntity, SensorEntity):
     def __init__(
             self,
             hass: HomeAssistant,
@@ -404,8 +517,9 @@ class KitaActiveSensor(CoordinatorEntity, SensorEntity):
         )
         self.entity_description = description
         self._attr_unique_id = f"{description.key}"
-        self.entity_id = generate_entity_id("sensor.{}", f"heat-pump-{description.name}", hass=hass)
+        self.entity_id = entity_id("sensor", description.name)
         self._attr_device_info = create_device_info()
+        self._init_publish(description)
 
     @callback
     def _handle_coordinator_update(self) -> None:
@@ -420,7 +534,79 @@ class KitaActiveSensor(CoordinatorEntity, SensorEntity):
             value = get_2comp(value)
             value *= 0.1
             self._attr_native_value = value
-            self.async_write_ha_state()
+            self._async_publish()
         else:
             self._attr_native_value = None
-            self.async_write_ha_state()
+            self._async_publish()
+
+
+class KitaDerivedSensor(KitaPublishMixin, CoordinatorEntity, SensorEntity):
+    entity_description: KitaDerivedSensorEntityDescription
+
+    def __init__(
+            self,
+            hass: HomeAssistant,
+            coordinator: KitaCoordinator,
+            config_entry: ConfigEntry,
+            description: KitaDerivedSensorEntityDescription,
+    ) -> None:
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._attr_unique_id = f"{description.key}"
+        self.entity_id = entity_id("sensor", description.name)
+        self._attr_device_info = create_device_info()
+        self._init_publish(description)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        descr = self.entity_description
+        value = descr.value_fn(self.coordinator)
+        self._attr_available = value is not None
+        self._attr_native_value = value
+        if descr.attrs_fn is not None:
+            self._attr_extra_state_attributes = descr.attrs_fn(self.coordinator)
+        self._async_publish()
+
+
+class KitaExplorerSensor(CoordinatorEntity, SensorEntity):
+    """Raw value of an otherwise unmapped register.
+
+    Registers inside the regular poll ranges are served from the main
+    snapshot; only the others get explorer reads of their own.
+
+    Thousands of these exist in explorer mode, so everything but the address
+    is shared at class level. Disabled entities are never added to hass and
+    therefore neither subscribe to the coordinator nor get polled.
+    """
+
+    entity_description = EXPLORER_DESCRIPTION
+    _attr_device_info = create_device_info()
+
+    def __init__(self, coordinator: KitaCoordinator, addr: int) -> None:
+        super().__init__(coordinator)
+        self._addr = addr
+        self.entity_id = f"sensor.heat_pump_r{addr}"
+
+    @property
+    def unique_id(self) -> str:
+        return f"explorer-{self._addr}"
+
+    @property
+    def name(self) -> str:
+        return f"R{self._addr}"
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.coordinator.enable_explorer_address(self._addr)
+        await self.coordinator.async_request_refresh()
+
+    async def async_will_remove_from_hass(self) -> None:
+        self.coordinator.disable_explorer_address(self._addr)
+        await super().async_will_remove_from_hass()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        value = self.coordinator.data.get(self._addr)
+        self._attr_available = value is not None
+        self._attr_native_value = value
+        self.async_write_ha_state()
@@ -0,0 +1,173 @@
+"""Services for the Templari Kita integration."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.exceptions import HomeAssistantError
+import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.service import async_register_admin_service
+
+from . import const
+from .coordinator import KitaCoordinator
+from .modbus import get_2comp
+from .registers import MULTIPLIERS
+from .trace import TraceRecorder, async_replay, read_trace
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_START_TRACE = "start_trace"
+SERVICE_STOP_TRACE = "stop_trace"
+SERVICE_REPLAY_TRACE = "replay_trace"
+SERVICE_STOP_REPLAY = "stop_replay"
+SERVICE_DUMP_SAMPLES = "dump_samples"
+SERVICE_READ_REGISTERS = "read_registers"
+
+ATTR_FILENAME = "filename"
+ATTR_SPEED = "speed"
+ATTR_ADDRESSES = "addresses"
+ATTR_ADDRESS = "address"
+ATTR_COUNT = "count"
+ATTR_MAX_AGE = "max_age"
+
+
+
+def _bare_filename(value: str) -> str:
+    """Trace files live directly in the configuration directory."""
+    if value in ("", ".", "..") or os.path.basename(value) != value or "\\" in value:
+        raise vol.Invalid("File name must not contain a directory")
+    return value
+
+
+START_TRACE_SCHEMA = vol.Schema({
+    vol.Optional(ATTR_FILENAME, default=const.DEFAULT_TRACE_FILE): vol.All(cv.string, _bare_filename),
+})
+
+REPLAY_TRACE_SCHEMA = vol.Schema({
+    vol.Optional(ATTR_FILENAME, default=const.DEFAULT_TRACE_FILE): vol.All(cv.string, _bare_filename),
+    vol.Optional(ATTR_SPEED, default=const.MIN_REPLAY_SPEED): vol.All(
+        vol.Coerce(float), vol.Range(min=const.MIN_REPLAY_SPEED, max=const.MAX_REPLAY_SPEED)
+    ),
+})
+
+DUMP_SAMPLES_SCHEMA = vol.Schema({
+    vol.Optional(ATTR_ADDRESSES): vol.All(cv.ensure_list, [vol.Coerce(int)]),
+})
+
+READ_REGISTERS_SCHEMA = vol.Schema({
+    vol.Required(ATTR_ADDRESS): vol.All(vol.Coerce(int), vol.Range(min=0, max=0xFFFF)),
+    vol.Optional(ATTR_COUNT, default=1): vol.All(vol.Coerce(int), vol.Range(min=1, max=const.MAX_READ_COUNT)),
+    vol.Optional(ATTR_MAX_AGE, default=const.REGISTER_CACHE_TTL): vol.All(vol.Coerce(float), vol.Range(min=0)),
+})
+
+
+def _get_coordinator(hass: HomeAssistant) -> KitaCoordinator:
+    entries = hass.data.get(const.DOMAIN)
+    if not entries:
+        raise HomeAssistantError("Templari Kita is not set up")
+    return next(iter(entries.values()))["coordinator"]
+
+
+async def async_setup_services(hass: HomeAssistant) -> None:
+    if hass.services.has_service(const.DOMAIN, SERVICE_START_TRACE):
+        return
+
+    async def start_trace(call: ServiceCall) -> None:
+        coordinator = _get_coordinator(hass)
+        if coordinator.trace_recorder is not None:
+            await coordinator.trace_recorder.async_close()
+        path = hass.config.path(call.data[ATTR_FILENAME])
+        coordinator.trace_recorder = TraceRecorder(hass, path)
+        _LOGGER.info(f"Recording raw polls to {path}")
+
+    async def stop_trace(call: ServiceCall) -> None:
+        coordinator = _get_coordinator(hass)
+        if (recorder := coordinator.trace_recorder) is None:
+            return
+        coordinator.trace_recorder = None
+        await recorder.async_close()
+        _LOGGER.info(f"Stopped recording, {recorder.records} polls written to {recorder.path}")
+
+    async def replay_trace(call: ServiceCall) -> None:
+        coordinator = _get_coordinator(hass)
+        if coordinator.replay_task is not None:
+            raise HomeAssistantError("A trace replay is already running")
+        path = hass.config.path(call.data[ATTR_FILENAME])
+        if not os.path.exists(path):
+            raise HomeAssistantError(f"Trace file {path} not found")
+        if coordinator.trace_recorder is not None and coordinator.trace_recorder.path == path:
+            await coordinator.trace_recorder.async_close()
+        records = await hass.async_add_executor_job(lambda: list(read_trace(path)))
+        # Checked again: another replay may have started while the file was read
+        if coordinator.replay_task is not None:
+            raise HomeAssistantError("A trace replay is already running")
+        # The replay can run for hours; return now and let stop_replay end it
+        task = hass.async_create_background_task(
+            async_replay(coordinator, records, call.data[ATTR_SPEED]), f"{const.DOMAIN} trace replay"
+        )
+        coordinator.replay_task = task
+
+        def done(_) -> None:
+            if coordinator.replay_task is task:
+                coordinator.replay_task = None
+
+        task.add_done_callback(done)
+
+    async def stop_replay(call: ServiceCall) -> None:
+        coordinator = _get_coordinator(hass)
+        if (task := coordinator.replay_task) is None:
+            return
+        task.cancel()
+        # Returns once the live client is back in place
+        await asyncio.wait([task])
+
+    async def dump_samples(call: ServiceCall) -> ServiceResponse:
+        coordinator = _get_coordinator(hass)
+        samples = coordinator.sampler.dump(call.data.get(ATTR_ADDRESSES))
+        return {
+            "samples": {
+                str(addr): [{"time": round(t, 3), "value": value} for t, value in values]
+                for addr, values in samples.items()
+            }
+        }
+
+    async def read_registers(call: ServiceCall) -> ServiceResponse:
+        coordinator = _get_coordinator(hass)
+        values = await coordinator.async_read_registers(
+            call.data[ATTR_ADDRESS], call.data[ATTR_COUNT], call.data[ATTR_MAX_AGE]
+        )
+        registers = {}
+        for addr, raw in values.items():
+            if raw is None:
+                registers[str(addr)] = None
+                continue
+            decoded = {"raw": raw, "signed": get_2comp(raw)}
+            if (multiplier := MULTIPLIERS.get(addr)) is not None:
+                decoded["value"] = round(get_2comp(raw) * multiplier, 3)
+            registers[str(addr)] = decoded
+        return {"registers": registers}
+
+    # Trace services touch files in the configuration directory
+    async_register_admin_service(hass, const.DOMAIN, SERVICE_START_TRACE, start_trace, schema=START_TRACE_SCHEMA)
+    async_register_admin_service(hass, const.DOMAIN, SERVICE_STOP_TRACE, stop_trace)
+    async_register_admin_service(hass, const.DOMAIN, SERVICE_REPLAY_TRACE, replay_trace, schema=REPLAY_TRACE_SCHEMA)
+    async_register_admin_service(hass, const.DOMAIN, SERVICE_STOP_REPLAY, stop_replay)
+    hass.services.async_register(
+        const.DOMAIN, SERVICE_DUMP_SAMPLES, dump_samples,
+        schema=DUMP_SAMPLES_SCHEMA, supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        const.DOMAIN, SERVICE_READ_REGISTERS, read_registers,
+        schema=READ_REGISTERS_SCHEMA, supports_response=SupportsResponse.ONLY,
+    )
+
+
+def async_unload_services(hass: HomeAssistant) -> None:
+    for service in (SERVICE_START_TRACE, SERVICE_STOP_TRACE, SERVICE_REPLAY_TRACE, SERVICE_STOP_REPLAY,
+                    SERVICE_DUMP_SAMPLES, SERVICE_READ_REGISTERS):
+        hass.services.async_remove(const.DOMAIN, service)
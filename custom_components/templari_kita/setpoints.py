@@ -0,0 +1,82 @@
+"""Setpoint writes, merged into as few VNC sessions as possible."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+
+from . import const
+from .coordinator import KitaCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class SetpointWriter:
+    """Queues setpoint clicks from every caller for a shared SET MANUAL visit.
+
+    Changes requested within SETPOINT_BATCH_DELAY of each other, or while a
+    session is already running, go out together in the next session.
+    """
+
+    def __init__(self, hass: HomeAssistant, coordinator: KitaCoordinator, hmi_host: str) -> None:
+        self.hass = hass
+        self.coordinator = coordinator
+        self.hmi_host = hmi_host
+        self.requests = 0
+        self.sessions = 0
+        self._pending: dict[str, int] = {}
+        self._waiters: list[asyncio.Future] = []
+        self._task: asyncio.Task | None = None
+
+    async def async_adjust(self, setpoint: str, clicks: int) -> None:
+        """Add clicks to the next session and wait until it has run."""
+        # Entities show replayed values during a replay; clicks computed
+        # from them must never reach the real HMI
+        if self.coordinator.replaying:
+            raise HomeAssistantError("Setpoints can't be changed while a trace is replaying")
+        # The limit applies to what one session sends, not to each caller's share
+        total = self._pending.get(setpoint, 0) + clicks
+        if abs(total) > const.MAX_SETPOINT_CLICKS:
+            raise HomeAssistantError(
+                f"{setpoint} change of {total:+d} clicks in one session exceeds the limit of "
+                f"{const.MAX_SETPOINT_CLICKS}"
+            )
+        self._pending[setpoint] = total
+        self.requests += 1
+        waiter = self.hass.loop.create_future()
+        self._waiters.append(waiter)
+        if self._task is None:
+            self._task = self.hass.async_create_task(self._async_run())
+        await waiter
+
+    async def _async_run(self) -> None:
+        # VNC (and its DES dependency) is only needed once a setpoint is written
+        from . import vnc
+
+        try:
+            while self._waiters:
+                await asyncio.sleep(const.SETPOINT_BATCH_DELAY)
+                async with vnc.LOCK:
+                    batch, self._pending = self._pending, {}
+                    waiters, self._waiters = self._waiters, []
+                    try:
+                        if any(batch.values()):
+                            _LOGGER.debug(f"Writing setpoints {batch} ({len(waiters)} requests)")
+                            await vnc.adjust_setpoints(self.hmi_host, batch)
+                            self.sessions += 1
+                    except Exception as e:
+                        for waiter in waiters:
+                            if not waiter.done():
+                                waiter.set_exception(e)
+                    else:
+                        for waiter in waiters:
+                            if not waiter.done():
+                                waiter.set_result(None)
+        finally:
+            self._task = None
+            for waiter in self._waiters:
+                waiter.cancel()
+            self._waiters = []
@@ -0,0 +1,170 @@
+"""In-memory hourly aggregation pushed to the recorder as external statistics."""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable
+
+from homeassistant.core import HomeAssistant
+
+from . import const
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class _Source:
+    statistic_id: str
+    name: str
+    unit: str | None
+    value_fn: Callable[[dict], float | None]
+    has_sum: bool
+    # (min, max) of the samples taken between polls, fast tier included
+    range_fn: Callable[[], tuple[float, float] | None] | None = None
+    # Accumulators for the hour in progress
+    total: float = 0.0
+    count: int = 0
+    min: float | None = None
+    max: float | None = None
+    last: float | None = None
+    rows: list[dict] = field(default_factory=list)
+
+
+class StatisticsAggregator:
+    """Aggregates samples per hour and imports finished hours in bulk.
+
+    Sources are registered by the entity platforms with a value function of
+    the register snapshot; the coordinator calls ``update`` once per poll.
+    Measurements get mean/min/max, cumulative totals get state/sum.
+
+    On unload the hour in progress is imported as it stands and handed over
+    through ``async_flush``; a successor set up within the same hour picks
+    the accumulators up again and later re-imports the complete hour.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+        self.sources: dict[str, _Source] = {}
+        self.imported_rows = 0
+        self._hour: datetime | None = None
+        self._carry: dict | None = None
+
+    def register(
+            self,
+            key: str,
+            name: str,
+            unit: str | None,
+            value_fn: Callable[[dict], float | None],
+            has_sum: bool = False,
+            range_fn: Callable[[], tuple[float, float] | None] | None = None,
+    ) -> None:
+        statistic_id = f"{const.DOMAIN}:{key.replace('-', '_')}"
+        self.sources[statistic_id] = _Source(statistic_id, name, unit, value_fn, has_sum, range_fn)
+
+    def update(self, now: datetime, data: dict) -> None:
+        hour = now.replace(minute=0, second=0, microsecond=0)
+        if self._hour is not None and hour != self._hour:
+            self._close_hour()
+            self.async_import()
+        self._hour = hour
+        if self._carry is not None:
+            self._resume(self._carry)
+            self._carry = None
+
+        for source in self.sources.values():
+            value = source.value_fn(data)
+            if value is None:
+                continue
+            source.total += value
+            source.count += 1
+            low = high = value
+            if source.range_fn is not None and (sample_range := source.range_fn()) is not None:
+                low, high = min(low, sample_range[0]), max(high, sample_range[1])
+            source.min = low if source.min is None else min(source.min, low)
+            source.max = high if source.max is None else max(source.max, high)
+            source.last = value
+
+    def async_flush(self) -> dict | None:
+        """Import everything including the hour in progress; returns its accumulators."""
+        if self._hour is None:
+            return None
+        carry = {
+            "hour": self._hour,
+            "sources": {
+                statistic_id: (source.total, source.count, source.min, source.max, source.last)
+                for statistic_id, source in self.sources.items()
+                if source.count
+            },
+        }
+        self._close_hour()
+        self.async_import()
+        return carry
+
+    def restore(self, carry: dict | None) -> None:
+        """Continue the hour a predecessor flushed, applied on the first update."""
+        self._carry = carry
+
+    def _resume(self, carry: dict) -> None:
+        if carry["hour"] != self._hour:
+            return
+        for statistic_id, (total, count, low, high, last) in carry["sources"].items():
+            if (source := self.sources.get(statistic_id)) is None:
+                continue
+            source.total += total
+            source.count += count
+            source.min = low if source.min is None else min(source.min, low)
+            source.max = high if source.max is None else max(source.max, high)
+            if source.last is None:
+                source.last = last
+
+    def _close_hour(self) -> None:
+        for source in self.sources.values():
+            if source.count == 0:
+                continue
+            if source.has_sum:
+                row = {"start": self._hour, "state": source.last, "sum": source.last}
+            else:
+                row = {
+                    "start": self._hour,
+                    "mean": source.total / source.count,
+                    "min": source.min,
+                    "max": source.max,
+                }
+            source.rows.append(row)
+            source.total = 0.0
+            source.count = 0
+            source.min = source.max = None
+
+    def async_import(self) -> None:
+        """Hand every finished hour to the recorder, one call per statistic."""
+        from homeassistant.components.recorder.statistics import async_add_external_statistics
+
+        for source in self.sources.values():
+            if not source.rows:
+                continue
+            metadata = {
+                "source": const.DOMAIN,
+                "statistic_id": source.statistic_id,
+                "name": f"Heat pump {source.name}",
+                "unit_of_measurement": source.unit,
+                "has_mean": not source.has_sum,
+                "has_sum": source.has_sum,
+            }
+            _add_mean_type(metadata)
+            async_add_external_statistics(self.hass, metadata, source.rows)
+            self.imported_rows += len(source.rows)
+            source.rows = []
+        _LOGGER.debug(f"Imported statistics, {self.imported_rows} rows so far")
+
+
+def _add_mean_type(metadata: dict) -> None:
+    # Newer recorders describe the mean with mean_type instead of has_mean
+    try:
+        from homeassistant.components.recorder.models import StatisticMeanType
+    except ImportError:
+        return
+    metadata["mean_type"] = (
+        StatisticMeanType.ARITHMETIC if metadata["has_mean"] else StatisticMeanType.NONE
+    )
@@ -0,0 +1,229 @@
+"""Raw poll trace recording and replay.
+
+A trace file is a stream of concatenated gzip members, one per flush, so it
+can be appended to at any time and read back with a single ``gzip.open``.
+The decompressed stream starts with ``TRACE_MAGIC`` followed by snapshot
+records:
+
+    <dB    monotonic poll timestamp, number of register ranges
+    <HHB   per range: start address, register count, status
+    <{n}H  register values (only when status is STATUS_OK)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import logging
+import os
+import struct
+import time
+import zlib
+from typing import Iterator, NamedTuple
+
+from homeassistant.core import HomeAssistant, callback
+
+_LOGGER = logging.getLogger(__name__)
+
+TRACE_MAGIC = b"KTRC\x01"
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+_RECORD_HEADER = struct.Struct("<dB")
+_RANGE_HEADER = struct.Struct("<HHB")
+
+# Flush the in-memory buffer once it grows past this size or age
+FLUSH_SIZE = 64 * 1024
+FLUSH_INTERVAL = 300  # seconds
+
+
+class TraceRecord(NamedTuple):
+    timestamp: float
+    # (start address, register count, registers or None on error)
+    reads: list[tuple[int, int, list[int] | None]]
+
+
+class TraceRecorder:
+    """Buffers raw register snapshots and appends them to a trace file."""
+
+    def __init__(self, hass: HomeAssistant, path: str) -> None:
+        self.hass = hass
+        self.path = path
+        self.records = 0
+        self._buffer = bytearray()
+        self._last_flush = time.monotonic()
+        self._flush_task: asyncio.Future | None = None
+
+    def record(self, timestamp: float, reads) -> None:
+        """Append one poll to the buffer (called from the event loop)."""
+        buf = self._buffer
+        buf += _RECORD_HEADER.pack(timestamp, len(reads))
+        for from_addr, count, regs in reads:
+            if regs is None:
+                buf += _RANGE_HEADER.pack(from_addr, count, STATUS_ERROR)
+            else:
+                buf += _RANGE_HEADER.pack(from_addr, len(regs), STATUS_OK)
+                buf += struct.pack(f"<{len(regs)}H", *regs)
+        self.records += 1
+        if len(buf) >= FLUSH_SIZE or timestamp - self._last_flush >= FLUSH_INTERVAL:
+            self.async_flush()
+
+    @callback
+    def async_flush(self) -> None:
+        """Hand the buffer over to an executor thread, one flush at a time."""
+        if not self._buffer or self._flush_task is not None:
+            return
+        chunk = bytes(self._buffer)
+        self._buffer.clear()
+        self._last_flush = time.monotonic()
+        self._flush_task = self.hass.async_add_executor_job(self._write, chunk)
+        self._flush_task.add_done_callback(self._flush_done)
+
+    @callback
+    def _flush_done(self, task: asyncio.Future) -> None:
+        self._flush_task = None
+        if not task.cancelled() and task.exception() is not None:
+            _LOGGER.error(f"Failed to write trace {self.path}: {task.exception()}")
+
+    async def async_close(self) -> None:
+        """Write out everything that is still buffered."""
+        if self._flush_task is not None:
+            await self._flush_task
+        if self._buffer:
+            chunk = bytes(self._buffer)
+            self._buffer.clear()
+            await self.hass.async_add_executor_job(self._write, chunk)
+
+    def _write(self, chunk: bytes) -> None:
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            chunk = TRACE_MAGIC + chunk
+        with open(self.path, "ab") as f:
+            f.write(gzip.compress(chunk))
+
+
+def _read_exact(f, size: int) -> bytes | None:
+    data = f.read(size)
+    return data if len(data) == size else None
+
+
+def read_trace(path: str) -> Iterator[TraceRecord]:
+    """Yield records from a trace file (blocking).
+
+    A truncated tail, e.g. after a crash mid-flush, ends the trace quietly.
+    """
+    with gzip.open(path, "rb") as f:
+        try:
+            if f.read(len(TRACE_MAGIC)) != TRACE_MAGIC:
+                raise ValueError(f"{path} is not a Templari Kita trace")
+            while (header := _read_exact(f, _RECORD_HEADER.size)) is not None:
+                timestamp, num_ranges = _RECORD_HEADER.unpack(header)
+                reads = []
+                for _ in range(num_ranges):
+                    range_header = _read_exact(f, _RANGE_HEADER.size)
+                    if range_header is None:
+                        return
+                    from_addr, count, status = _RANGE_HEADER.unpack(range_header)
+                    regs = None
+                    if status == STATUS_OK:
+                        values = _read_exact(f, 2 * count)
+                        if values is None:
+                            return
+                        regs = list(struct.unpack(f"<{count}H", values))
+                    reads.append((from_addr, count, regs))
+                yield TraceRecord(timestamp, reads)
+        except (EOFError, zlib.error, gzip.BadGzipFile) as e:
+            _LOGGER.warning(f"Trace {path} ends with a damaged chunk ({e})")
+
+
+class _ReplayResponse:
+    def __init__(self, registers: list[int] | None) -> None:
+        self.registers = registers if registers is not None else []
+        self._error = registers is None
+
+    def isError(self) -> bool:
+        return self._error
+
+
+class ReplayClient:
+    """Stands in for AsyncModbusTcpClient, serving reads from a trace record."""
+
+    connected = True
+
+    def __init__(self) -> None:
+        self._values: dict[int, int] = {}
+        self._timestamp = 0.0
+
+    def clock(self) -> float:
+        """Recorded poll time, standing in for time.monotonic()."""
+        return self._timestamp
+
+    def load(self, record: TraceRecord) -> None:
+        self._timestamp = record.timestamp
+        self._values = {}
+        for from_addr, _, regs in record.reads:
+            if regs is not None:
+                for i, reg in enumerate(regs):
+                    self._values[from_addr + i] = reg
+
+    async def read_input_registers(self, address, count=1, device_id=1):
+        try:
+            return _ReplayResponse([self._values[a] for a in range(address, address + count)])
+        except KeyError:
+            return _ReplayResponse(None)
+
+    def close(self) -> None:
+        pass
+
+
+async def async_replay(coordinator, records: list[TraceRecord], speed: float = 1.0) -> None:
+    """Feed recorded polls through the coordinator in place of the live client.
+
+    Live polling and trace recording are suspended while replaying and the
+    persisted totals are restored afterwards; the gaps between recorded polls
+    are compressed by ``speed``. The live client is only swapped out once any
+    poll or sample in flight has finished. Only one replay may run at a time;
+    cancelling the task ends it early and puts the live client back.
+    """
+    if coordinator.replaying:
+        raise RuntimeError("A trace replay is already running")
+    coordinator.replaying = True
+    try:
+        async with coordinator._poll_lock, coordinator._sample_lock:
+            await _async_replay_locked(coordinator, records, speed)
+    finally:
+        coordinator.replaying = False
+
+
+async def _async_replay_locked(coordinator, records: list[TraceRecord], speed: float) -> None:
+    live_client = coordinator.client
+    trace_recorder = coordinator.trace_recorder
+    replay_client = ReplayClient()
+
+    coordinator.client = replay_client
+    coordinator.clock = replay_client.clock
+    coordinator.trace_recorder = None
+    _LOGGER.info(f"Replaying {len(records)} polls at {speed}x")
+    cancelled = False
+    try:
+        previous = None
+        for record in records:
+            if previous is not None:
+                await asyncio.sleep(max(0.0, record.timestamp - previous) / speed)
+            previous = record.timestamp
+            replay_client.load(record)
+            await coordinator.async_refresh()
+    except asyncio.CancelledError:
+        cancelled = True
+        _LOGGER.info("Trace replay stopped")
+        raise
+    finally:
+        coordinator.client = live_client
+        coordinator.clock = time.monotonic
+        coordinator.trace_recorder = trace_recorder
+        coordinator.restore_state()
+        # Still holding the poll lock, so no aligned poll can overlap this one;
+        # a cancelled replay leaves it to the next aligned poll (or to unload)
+        if not cancelled:
+            coordinator.replaying = False
+            await coordinator.async_refresh()
@@ -5,10 +5,10 @@ import logging
 import socket
 import struct
 import time
+import weakref
+from io import BytesIO
 from typing import Optional
 
-from Crypto.Cipher import DES
-
 _LOGGER = logging.getLogger(__name__)
 
 # Button coordinates on the SET MANUAL dialog (800x480 screen)
@@ -25,6 +25,29 @@ BUTTONS = {
 }
 
 
+class VNCStats:
+    """Timing of VNC write sessions, for diagnostics and metrics."""
+
+    def __init__(self) -> None:
+        self.sessions = 0
+        self.failures = 0
+        self.total_duration = 0.0
+        self.last_duration: Optional[float] = None
+
+
+STATS = VNCStats()
+
+# Serialises VNC sessions: the HMI serves a single client at a time
+LOCK = asyncio.Lock()
+
+# Open mirror sessions, closed before a write session connects
+_MIRRORS: "weakref.WeakSet[VNCMirror]" = weakref.WeakSet()
+
+# RFB encodings understood by the mirror
+ENCODING_RAW = 0
+ENCODING_COPYRECT = 1
+
+
 def _vnc_des_key(password: str) -> bytes:
     """Convert password to VNC DES key (bit-reversed per byte)."""
     key = bytearray(8)
@@ -49,9 +72,14 @@ class VNCClient:
         self.port = port
         self.password = password
         self._sock: Optional[socket.socket] = None
+        self.width = 0
+        self.height = 0
 
     def _connect_sync(self) -> None:
         """Blocking connect + VNC auth."""
+        # Imported here so loading the integration doesn't pull in the cipher
+        from Crypto.Cipher import DES
+
         sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         sock.settimeout(10)
         sock.connect((self.host, self.port))
@@ -74,8 +102,24 @@ class VNCClient:
             raise ConnectionError("VNC authentication failed")
 
         sock.send(bytes([1]))  # ClientInit: shared
-        sock.recv(4096)  # ServerInit (discard)
         self._sock = sock
+        # ServerInit: size, pixel format, name (discarded)
+        self.width, self.height = struct.unpack(">HH", self._recv_exact(4))
+        self._recv_exact(16)
+        (name_length,) = struct.unpack(">I", self._recv_exact(4))
+        self._recv_exact(name_length)
+
+    def _recv_exact(self, size: int) -> bytes:
+        """Receive exactly ``size`` bytes."""
+        buf = bytearray(size)
+        view = memoryview(buf)
+        received = 0
+        while received < size:
+            n = self._sock.recv_into(view[received:])
+            if not n:
+                raise ConnectionError("VNC connection closed")
+            received += n
+        return bytes(buf)
 
     def _click_sync(self, x: int, y: int, delay: float = 0.3) -> None:
         """Send a mouse click at (x, y)."""
@@ -110,26 +154,31 @@ class VNCClient:
                 pass
             self._sock = None
 
-    def _adjust_setpoint_sync(
-        self, setpoint: str, clicks: int
-    ) -> None:
+    def _adjust_setpoints_sync(self, clicks_by_setpoint: dict[str, int]) -> None:
         """
-        Open the SET MANUAL dialog and click +/- to adjust a setpoint.
+        Adjust several setpoints in one visit to the SET MANUAL dialog.
 
         Args:
-            setpoint: "winter", "dhw", or "summer"
-            clicks: Positive for increase, negative for decrease.
+            clicks_by_setpoint: Clicks per setpoint ("winter", "dhw" or
+                "summer"); positive for increase, negative for decrease.
         """
-        if clicks == 0:
-            return
+        from .const import MAX_SETPOINT_CLICKS
 
-        direction = "plus" if clicks > 0 else "minus"
-        button_key = f"{setpoint}_{direction}"
-        num_clicks = abs(clicks)
+        clicks_by_setpoint = {k: v for k, v in clicks_by_setpoint.items() if v}
+        if not clicks_by_setpoint:
+            return
+        # Checked before connecting, so an oversized batch never opens the dialog
+        for setpoint, clicks in clicks_by_setpoint.items():
+            if abs(clicks) > MAX_SETPOINT_CLICKS:
+                raise ValueError(
+                    f"{abs(clicks)} clicks for {setpoint} exceed the limit of {MAX_SETPOINT_CLICKS}"
+                )
 
-        _LOGGER.debug(
-            "VNC adjusting %s: %d clicks %s", setpoint, num_clicks, direction
-        )
+        for setpoint, clicks in clicks_by_setpoint.items():
+            _LOGGER.debug(
+                "VNC adjusting %s: %d clicks %s",
+                setpoint, abs(clicks), "plus" if clicks > 0 else "minus",
+            )
 
         self._connect_sync()
         try:
@@ -142,33 +191,185 @@ class VNCClient:
             self._drain_sync()
 
             # Click +/- the required number of times
-            bx, by = BUTTONS[button_key]
-            for _ in range(num_clicks):
-                self._click_sync(bx, by, delay=0.35)
+            for setpoint, clicks in clicks_by_setpoint.items():
+                direction = "plus" if clicks > 0 else "minus"
+                bx, by = BUTTONS[f"{setpoint}_{direction}"]
+                for _ in range(abs(clicks)):
+                    self._click_sync(bx, by, delay=0.35)
 
             self._drain_sync()
         finally:
             self._close_sync()
 
 
-async def adjust_setpoint(
+def _write_session_sync(client: VNCClient, clicks_by_setpoint: dict[str, int]) -> None:
+    # The HMI serves one client; a mirror reconnects (with a full frame) later
+    for mirror in list(_MIRRORS):
+        mirror._close_sync()
+    client._adjust_setpoints_sync(clicks_by_setpoint)
+
+
+class VNCMirror(VNCClient):
+    """Keeps a local copy of the HMI screen, fed by incremental updates.
+
+    The framebuffer is allocated once per connection (32 bpp, RGBX byte
+    order) and only the rectangles the server reports as changed are
+    patched into it. ``dirty`` stays set until the frame is next encoded.
+    """
+
+    def __init__(self, host: str, port: int, password: str) -> None:
+        super().__init__(host, port, password)
+        self.framebuffer: Optional[bytearray] = None
+        self.dirty = False
+        self.updates = 0
+        self.rects = 0
+        self._incremental = False
+
+    @property
+    def connected(self) -> bool:
+        return self._sock is not None
+
+    def _open_sync(self) -> None:
+        self._connect_sync()
+        # SetPixelFormat: 32 bpp, depth 24, little endian, true colour,
+        # red/green/blue at shifts 0/8/16 so pixels land as R, G, B, X bytes
+        self._sock.sendall(struct.pack(
+            ">BxxxBBBBHHHBBBxxx", 0, 32, 24, 0, 1, 255, 255, 255, 0, 8, 16
+        ))
+        # SetEncodings: CopyRect first so moved regions aren't resent as raw
+        self._sock.sendall(struct.pack(">BxHii", 2, 2, ENCODING_COPYRECT, ENCODING_RAW))
+        if self.framebuffer is None or len(self.framebuffer) != self.width * self.height * 4:
+            self.framebuffer = bytearray(self.width * self.height * 4)
+        # The first request after connecting fetches the whole screen once
+        self._incremental = False
+        _MIRRORS.add(self)
+
+    def _close_sync(self) -> None:
+        super()._close_sync()
+        _MIRRORS.discard(self)
+
+    def _refresh_sync(self, timeout: float) -> bool:
+        """Request an update and apply it; returns whether the frame changed.
+
+        Connects on first use. A server with nothing new to send stays
+        silent, so waiting up to ``timeout`` for the reply is normal.
+        """
+        if self._sock is None:
+            self._open_sync()
+        try:
+            self._sock.sendall(struct.pack(
+                ">BBHHHH", 3, 1 if self._incremental else 0, 0, 0, self.width, self.height
+            ))
+            self._incremental = True
+            return self._receive_sync(timeout)
+        except (OSError, ConnectionError, struct.error):
+            self._close_sync()
+            raise
+
+    def _receive_sync(self, timeout: float) -> bool:
+        changed = False
+        self._sock.settimeout(timeout)
+        try:
+            while True:
+                try:
+                    msg_type = self._recv_exact(1)[0]
+                except socket.timeout:
+                    break
+                # Everything after the message type arrives promptly
+                self._sock.settimeout(10)
+                if msg_type == 0:
+                    changed |= self._apply_update_sync()
+                    break
+                elif msg_type == 1:  # SetColourMapEntries
+                    _, _, count = struct.unpack(">BHH", self._recv_exact(5))
+                    self._recv_exact(count * 6)
+                elif msg_type == 2:  # Bell
+                    pass
+                elif msg_type == 3:  # ServerCutText
+                    (length,) = struct.unpack(">3xI", self._recv_exact(7))
+                    self._recv_exact(length)
+                else:
+                    raise ConnectionError(f"Unexpected VNC message type {msg_type}")
+                self._sock.settimeout(timeout)
+        finally:
+            if self._sock is not None:
+                self._sock.settimeout(10)
+        self.dirty |= changed
+        return changed
+
+    def _apply_update_sync(self) -> bool:
+        (count,) = struct.unpack(">xH", self._recv_exact(3))
+        fb = self.framebuffer
+        stride = self.width * 4
+        for _ in range(count):
+            x, y, w, h, encoding = struct.unpack(">HHHHi", self._recv_exact(12))
+            # Patching outside the screen would silently grow the framebuffer
+            if x + w > self.width or y + h > self.height:
+                raise ConnectionError(f"VNC rectangle {w}x{h}+{x}+{y} outside the screen")
+            if encoding == ENCODING_RAW:
+                row_bytes = w * 4
+                data = self._recv_exact(row_bytes * h)
+                for row in range(h):
+                    offset = (y + row) * stride + x * 4
+                    fb[offset:offset + row_bytes] = data[row * row_bytes:(row + 1) * row_bytes]
+            elif encoding == ENCODING_COPYRECT:
+                src_x, src_y = struct.unpack(">HH", self._recv_exact(4))
+                if src_x + w > self.width or src_y + h > self.height:
+                    raise ConnectionError(f"VNC copy source {w}x{h}+{src_x}+{src_y} outside the screen")
+                row_bytes = w * 4
+                # Copy the source out first; the areas may overlap
+                rows = [
+                    bytes(fb[(src_y + row) * stride + src_x * 4:(src_y + row) * stride + src_x * 4 + row_bytes])
+                    for row in range(h)
+                ]
+                for row, data in enumerate(rows):
+                    offset = (y + row) * stride + x * 4
+                    fb[offset:offset + row_bytes] = data
+            else:
+                raise ConnectionError(f"Unsupported VNC encoding {encoding}")
+        self.updates += 1
+        self.rects += count
+        return count > 0
+
+    def encode_jpeg(self, quality: int = 80) -> bytes:
+        """Encode the current framebuffer and clear ``dirty``."""
+        from PIL import Image
+
+        image = Image.frombuffer(
+            "RGBX", (self.width, self.height), bytes(self.framebuffer), "raw", "RGBX", 0, 1
+        )
+        out = BytesIO()
+        image.convert("RGB").save(out, format="JPEG", quality=quality)
+        self.dirty = False
+        return out.getvalue()
+
+
+async def adjust_setpoints(
     hmi_host: str,
-    setpoint: str,
-    clicks: int,
+    clicks_by_setpoint: dict[str, int],
 ) -> None:
     """
-    Adjust a heat pump setpoint via VNC (async wrapper).
+    Adjust several setpoints in a single VNC session (async wrapper).
 
     Runs the blocking VNC session in an executor thread so the HA
-    event loop is not blocked.
+    event loop is not blocked. Callers hold LOCK; any open mirror
+    session is closed first.
 
     Args:
         hmi_host: IP of the Weintek HMI (e.g. "10.0.42.132").
-        setpoint: "winter", "dhw", or "summer".
-        clicks: Number of 0.5°C steps. Positive = warmer, negative = cooler.
+        clicks_by_setpoint: Number of 0.5°C steps per setpoint.
     """
     from .const import VNC_PORT, VNC_PASSWORD
 
     client = VNCClient(hmi_host, VNC_PORT, VNC_PASSWORD)
     loop = asyncio.get_running_loop()
-    await loop.run_in_executor(None, client._adjust_setpoint_sync, setpoint, clicks)
+    started = time.monotonic()
+    try:
+        await loop.run_in_executor(None, _write_session_sync, client, clicks_by_setpoint)
+    except Exception:
+        STATS.failures += 1
+        raise
+    finally:
+        STATS.sessions += 1
+        STATS.last_duration = time.monotonic() - started
+        STATS.total_duration += STATS.last_duration
@@ -0,0 +1,180 @@
+"""Websocket API streaming register deltas straight from coordinator snapshots."""
+
+from __future__ import annotations
+
+from typing import Callable
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+
+from . import const
+from .coordinator import KitaCoordinator
+
+TYPE_SUBSCRIBE = f"{const.DOMAIN}/subscribe"
+TYPE_ACK = f"{const.DOMAIN}/ack"
+
+# Longest address list a single subscription may watch
+MAX_SUBSCRIBED_ADDRESSES = 512
+# Unacknowledged batches a client may have in flight unless it asks otherwise
+DEFAULT_WINDOW = 8
+# Sent to open subscriptions when their entry unloads; clients subscribe again
+ERR_UNLOADED = "unloaded"
+
+# Live subscriptions by (connection, subscribe message id), for ack lookups
+_SUBSCRIPTIONS: dict[tuple[int, int], "_Subscription"] = {}
+
+
+class _Subscription:
+    """Per-client delta state.
+
+    Batches go out after every published snapshot and after every fast-tier
+    sample. With a credit ``window`` the client acknowledges batches by
+    sequence number; while ``window`` batches are unacknowledged, further
+    changes are merged (latest value per address wins) instead of queued, so
+    a slow client costs at most one pending batch of memory. A window of 0
+    turns flow control off.
+    """
+
+    def __init__(self, connection, msg_id: int, coordinator: KitaCoordinator,
+                 addresses: list[int], deadband: int, window: int) -> None:
+        self.connection = connection
+        self.msg_id = msg_id
+        self.coordinator = coordinator
+        self.addresses = addresses
+        self._watched = set(addresses)
+        self.deadband = deadband
+        self.window = window
+        self.seq = 0
+        self.acked = 0
+        self.last_sent: dict[int, int | None] = {}
+        self.pending: dict[int, list] = {}
+        self.unsubscribe: Callable[[], None] | None = None
+
+    @callback
+    def async_on_snapshot(self) -> None:
+        data = self.coordinator.data
+        if data is None:
+            return
+        for addr in self.addresses:
+            read = data.read_of(addr)
+            self._offer(addr, data.get(addr), None if read is None else read.utc)
+        self.async_flush()
+
+    @callback
+    def async_on_samples(self, samples: dict) -> None:
+        for addr, (value, utc) in samples.items():
+            if addr in self._watched:
+                self._offer(addr, value, utc)
+        self.async_flush()
+
+    def _offer(self, addr: int, value: int | None, utc) -> None:
+        if addr in self.last_sent:
+            last = self.last_sent[addr]
+            if value == last:
+                return
+            if value is not None and last is not None and abs(value - last) <= self.deadband:
+                return
+        self.pending[addr] = [addr, value, None if utc is None else round(utc.timestamp(), 3)]
+        self.last_sent[addr] = value
+
+    @callback
+    def async_flush(self) -> None:
+        if not self.pending:
+            return
+        if self.window and self.seq - self.acked >= self.window:
+            return
+        self.seq += 1
+        self.connection.send_message(
+            websocket_api.event_message(self.msg_id, {"seq": self.seq, "d": list(self.pending.values())})
+        )
+        self.pending = {}
+
+    @callback
+    def async_ack(self, seq: int) -> None:
+        self.acked = max(self.acked, min(seq, self.seq))
+        self.async_flush()
+
+
+def _get_coordinator(hass: HomeAssistant) -> KitaCoordinator | None:
+    entries = hass.data.get(const.DOMAIN)
+    if not entries:
+        return None
+    return next(iter(entries.values()))["coordinator"]
+
+
+@websocket_api.websocket_command({
+    vol.Required("type"): TYPE_SUBSCRIBE,
+    vol.Required("addresses"): vol.All(
+        [vol.All(vol.Coerce(int), vol.Range(min=0, max=0xFFFF))],
+        vol.Length(min=1, max=MAX_SUBSCRIBED_ADDRESSES),
+    ),
+    vol.Optional("deadband", default=0): vol.All(vol.Coerce(int), vol.Range(min=0)),
+    vol.Optional("window", default=DEFAULT_WINDOW): vol.All(vol.Coerce(int), vol.Range(min=0)),
+})
+@callback
+def ws_subscribe(hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict) -> None:
+    """Stream raw register changes, one batch per snapshot.
+
+    Each event carries ``seq`` and ``d``, a list of [address, raw value, read
+    time]. Changes of ``deadband`` raw counts or less are suppressed. Clients
+    acknowledge with ``templari_kita/ack`` or subscribe with ``window`` 0.
+    """
+    coordinator = _get_coordinator(hass)
+    if coordinator is None:
+        connection.send_error(msg["id"], websocket_api.ERR_NOT_FOUND, "Templari Kita is not set up")
+        return
+
+    subscription = _Subscription(
+        connection, msg["id"], coordinator, msg["addresses"], msg["deadband"], msg["window"]
+    )
+    remove_listener = coordinator.async_add_listener(subscription.async_on_snapshot)
+    remove_sample_listener = coordinator.async_add_sample_listener(subscription.async_on_samples)
+    key = (id(connection), msg["id"])
+    _SUBSCRIPTIONS[key] = subscription
+
+    @callback
+    def unsubscribe() -> None:
+        remove_listener()
+        remove_sample_listener()
+        _SUBSCRIPTIONS.pop(key, None)
+
+    subscription.unsubscribe = unsubscribe
+    connection.subscriptions[msg["id"]] = unsubscribe
+    connection.send_result(msg["id"])
+    subscription.async_on_snapshot()
+
+
+@websocket_api.websocket_command({
+    vol.Required("type"): TYPE_ACK,
+    vol.Required("subscription"): int,
+    vol.Required("seq"): int,
+})
+@callback
+def ws_ack(hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict) -> None:
+    """Acknowledge delta batches up to ``seq``, releasing flow-control credit."""
+    subscription = _SUBSCRIPTIONS.get((id(connection), msg["subscription"]))
+    if subscription is None:
+        connection.send_error(msg["id"], websocket_api.ERR_NOT_FOUND, "Unknown subscription")
+        return
+    subscription.async_ack(msg["seq"])
+    connection.send_result(msg["id"])
+
+
+@callback
+def async_end_subscriptions(coordinator: KitaCoordinator) -> None:
+    """End every subscription streaming from ``coordinator``, e.g. before a reload."""
+    for subscription in [s for s in _SUBSCRIPTIONS.values() if s.coordinator is coordinator]:
+        connection = subscription.connection
+        connection.subscriptions.pop(subscription.msg_id, None)
+        subscription.unsubscribe()
+        connection.send_error(
+            subscription.msg_id, ERR_UNLOADED, "Templari Kita was unloaded; subscribe again"
+        )
+
+
+@callback
+def async_register_websocket_commands(hass: HomeAssistant) -> None:
+    websocket_api.async_register_command(hass, ws_subscribe)
+    websocket_api.async_register_command(hass, ws_ack)